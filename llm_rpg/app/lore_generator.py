@@ -4,12 +4,74 @@ Function to generate game lore based on the config and prints the nice output to
 
 from llm_rpg.engine.lore_generation import LoreGeneratorGvt
 from llm_rpg.templates.base_client import BaseClient
+from llm_rpg.clients.caching_client import CachingClient
+from llm_rpg.clients.rate_limited_client import RateLimitedClient
+from llm_rpg.utils.rate_limiter import RateLimiter
 from typing import Dict, Any
+import asyncio
+import hashlib
 import logging
-from time import sleep
 import os
 import json
 
+try:
+    import orjson
+    F_IS_ORJSON = True
+except ImportError:
+    F_IS_ORJSON = False
+
+
+def _to_json_bytes(obj: Any, pretty: bool = False) -> bytes:
+    """Encodes obj to JSON with orjson when available, stdlib json otherwise"""
+    if F_IS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, indent=4).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _dump(obj: Any, path: str, pretty: bool = True) -> None:
+    """Serializes obj in one go and writes it with a single call (json.dump issues a write per chunk)"""
+    with open(path, "wb") as f:
+        f.write(_to_json_bytes(obj, pretty=pretty))
+
+
+def lore_config_hash(gen_config: Dict[str, Any], temperatures: Dict[str, Any]) -> str:
+    """Fingerprint of the generation parameters, a checkpoint is reused only if it matches"""
+    payload = json.dumps(
+        {"lore_generation": gen_config, "temperatures": temperatures},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def replay_lore_checkpoints(path: str, config_hash: str | None = None) -> Dict[str, Any]:
+    """
+    Rebuilds the lore from the checkpoint log written by GenerateLore.
+    :param path: str -- path to "lore.jsonl"
+    :param config_hash: str -- if given, only the entries written with these generation
+        parameters (see lore_config_hash()) are applied
+    :return: Dict[str, Any] -- lore with all completed stages applied in order
+    """
+    logger = logging.getLogger(__name__)
+    loads = orjson.loads if F_IS_ORJSON else json.loads
+    lore = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = loads(line)
+            except json.JSONDecodeError:
+                # the last line may be truncated if the generation crashed mid-write
+                logger.warning('Skipping malformed checkpoint line in "%s"', path)
+                continue
+            if config_hash is not None and entry.get("config_hash") != config_hash:
+                continue
+            lore.update(entry["data"])
+    return lore
+
 
 def GenerateLore(
     llm: BaseClient,
@@ -45,6 +107,45 @@ def GenerateLore(
     temperature_min = gen_config["temperature_min"]
     world_type = gen_config["world_setting"]
     world_kind = gen_config["world_type"]
+    max_workers = gen_config.get("max_concurrent_requests", 4)
+    npc_batch_size = gen_config.get("npc_batch_size", 8)
+    fused_party = gen_config.get("fused_party", False)
+
+    # output locations
+    lore_path = os.path.join(save_location, "lore.json")
+    params_path = os.path.join(save_location, "gen_lore_params.json")
+    checkpoints_path = os.path.join(save_location, "lore.jsonl")
+    # the generation parameters are kept next to the checkpoints, so that an
+    # interrupted game can be resumed when it is loaded
+    gen_config_path = os.path.join(save_location, "lore_config.json")
+    # a shared folder lets new games reuse the responses of earlier ones
+    cache_dir = gen_config.get("llm_cache_dir") or os.path.join(save_location, "llm_cache")
+    cache_dir = os.path.expanduser(cache_dir)
+
+    # no fixed pauses between the stages: calls wait only when the budget is used up
+    # and back off on rate limit errors
+    llm = RateLimitedClient(
+        llm,
+        RateLimiter(
+            rps=gen_config.get("requests_per_second"),
+            tpm=gen_config.get("tokens_per_minute"),
+        ),
+        max_prompt_tokens=gen_config.get("max_prompt_tokens"),
+    )
+
+    # cache hits do not count against the rate limit
+    if gen_config.get("llm_cache", True):
+        pool_size = gen_config.get("llm_cache_pool_size")
+        if pool_size is None:
+            # the per-game cache only replays the responses of a resumed generation, a
+            # shared one would hand the same sampled lore to every new game
+            pool_size = 0 if gen_config.get("llm_cache_dir") else 1
+        llm = CachingClient(
+            llm,
+            cache_dir,
+            pool_size=pool_size,
+            refresh=gen_config.get("llm_cache_refresh", False),
+        )
 
     generator = LoreGeneratorGvt(
         llm,
@@ -52,85 +153,172 @@ def GenerateLore(
         temperature_min=temperature_min,
     )
 
-    # ----- Generating the world -----
-    msg = "Generating the world"
-    logger.info(msg)
-    if world_kind in ["dark", "neutral", "funny"]:
-        msg = f"Generating the world with {num_world_rules_per_category} rules per category for a {world_kind} {world_type} world."
-        logger.info(msg)
-        console_manager.console.print(msg)
-        generator.generate_world(
-            num_world_rules_per_category,
-            world_kind,
-            world_type,
-            max_retries=max_retries,
-            temperature=temp_world_gen,
-        )
-    else:
-        raise ValueError(f"World kind is not recognized! Got {world_kind}")
-
-    with open(os.path.join(save_location, f"lore.json"), "w") as f:
-        json.dump(generator.lore, f, indent=4)
-
-    # ----- Generating the kingdoms -----
-    msg = f"Generating {num_kingdoms} kingdoms"
-    logger.info(msg)
-    console_manager.console.print(msg)
-    generator.generate_kingdoms(num_kingdoms=num_kingdoms, **llm_kw)
-    with open(os.path.join(save_location, f"lore.json"), "w") as f:
-        json.dump(generator.lore, f, indent=4)
-
-    # ----- Generating the towns -----
-    msg = f"Generating {num_towns} towns for each kingdom"
-    logger.info(msg)
-    console_manager.console.print(msg)
-    generator.generate_towns(num_towns=num_towns, **llm_kw)
-    with open(os.path.join(save_location, f"lore.json"), "w") as f:
-        json.dump(generator.lore, f, indent=4)
-
-    # ----- Generating human player card -----
-    msg = "Generating human player character"
-    logger.info(msg)
-    console_manager.console.print(msg)
-    generator.generate_human_player(**llm_kw)
-    with open(os.path.join(save_location, f"lore.json"), "w") as f:
-        json.dump(generator.lore, f, indent=4)
-
-    # ----- Generating NPCs -----
-    msg = f"Generating {num_npc} NPC(s)"
-    logger.info(msg)
-    console_manager.console.print(msg)
-    generator.generate_npc(num_chars=num_npc, temperature=temp_npc_gen)
-    with open(os.path.join(save_location, f"lore.json"), "w") as f:
-        json.dump(generator.lore, f, indent=4)
-
-    # ----- Generating action rules for the NPCs -----
-    msg = f"Generation action rules for the NPCs"
-    logger.info(msg)
-    console_manager.console.print(msg)
-    generator.generate_npc_action_rules(
-        num_rules_per_category=num_npc_rules_per_category,
-        max_retries=max_retries,
-        temperature=temp_action_rules,
-    )
-    with open(os.path.join(save_location, f"lore.json"), "w") as f:
-        json.dump(generator.lore, f, indent=4)
+    # Resume a crashed generation into the same folder: the stages checkpointed with
+    # the same generation parameters are not generated again
+    config_hash = lore_config_hash(gen_config, temps)
+    _dump(gen_config, gen_config_path)
+    if os.path.exists(checkpoints_path):
+        resumed = replay_lore_checkpoints(checkpoints_path, config_hash=config_hash)
+        if resumed:
+            logger.info("Resuming lore generation, found: %s", list(resumed))
+            console_manager.console.print("Resuming the lore generation from the checkpoint")
+            generator.restore(resumed)
+
+    # Each stage appends only the lore parts it produced to "lore.jsonl" through
+    # a single file handle kept open for the whole run; the full "lore.json" is
+    # written once at the end. See replay_lore_checkpoints() to recover after a crash.
+    console = console_manager.console
+    # spinner text shown while a stage waits for the LLM
+    waiting = "Waiting for the LLM..."
+
+    # The async stages share one event loop: the async SDK clients are cached on the
+    # wrapped clients and keep their connection pools bound to the loop they were first
+    # used on, a second asyncio.run() would hand them a new loop
+    with open(checkpoints_path, "ab") as log_f, asyncio.Runner() as runner:
+
+        def checkpoint(stage: str, delta: Dict[str, Any]) -> None:
+            """Appends the lore parts produced by a stage to the checkpoint log"""
+            # machine-only record: compact output, pretty-printing is kept for lore.json
+            entry = {"stage": stage, "config_hash": config_hash, "data": delta}
+            log_f.write(_to_json_bytes(entry) + b"\n")
+            log_f.flush()
+
+        # ----- Generating the world -----
+        if "world" not in generator.lore:
+            msg = "Generating the world"
+            logger.info(msg)
+            if world_kind in ["dark", "neutral", "funny"]:
+                msg = f"Generating the world with {num_world_rules_per_category} rules per category for a {world_kind} {world_type} world."
+                logger.info(msg)
+                console.print(msg)
+                with console.status(waiting):
+                    generator.generate_world(
+                        num_world_rules_per_category,
+                        world_kind,
+                        world_type,
+                        max_retries=max_retries,
+                        temperature=temp_world_gen,
+                    )
+            else:
+                raise ValueError(f"World kind is not recognized! Got {world_kind}")
+
+            checkpoint(
+                "world",
+                {
+                    "world_outline": generator.lore["world_outline"],
+                    "world": generator.lore["world"],
+                },
+            )
+
+        # ----- Generating the kingdoms -----
+        if "kingdoms" not in generator.lore:
+            msg = f"Generating {num_kingdoms} kingdoms"
+            logger.info(msg)
+            console.print(msg)
+            with console.status(waiting):
+                generator.generate_kingdoms(num_kingdoms=num_kingdoms, **llm_kw)
+            checkpoint("kingdoms", {"kingdoms": generator.lore["kingdoms"]})
+
+        # ----- Generating the towns -----
+        if "towns" not in generator.lore:
+            msg = f"Generating {num_towns} towns for each kingdom"
+            logger.info(msg)
+            console.print(msg)
+            with console.status(waiting):
+                runner.run(
+                    generator.agenerate_towns(
+                        num_towns=num_towns, max_workers=max_workers, **llm_kw
+                    )
+                )
+            checkpoint("towns", {"towns": generator.lore["towns"]})
+
+        # ----- Generating the player and the NPCs in one call -----
+        if fused_party and "human_player" not in generator.lore and "npc" not in generator.lore:
+            msg = f"Generating human player character and {num_npc} NPC(s)"
+            logger.info(msg)
+            console.print(msg)
+            with console.status(waiting):
+                generator.generate_party(
+                    num_npcs=num_npc,
+                    batch_size=npc_batch_size,
+                    player_kw=llm_kw,
+                    temperature=temp_npc_gen,
+                )
+            checkpoint(
+                "party",
+                {
+                    "human_player": generator.lore["human_player"],
+                    "npc": generator.lore["npc"],
+                    "start_location": generator.lore["start_location"],
+                },
+            )
+
+        # ----- Generating human player card -----
+        if "human_player" not in generator.lore:
+            msg = "Generating human player character"
+            logger.info(msg)
+            console.print(msg)
+            with console.status(waiting):
+                generator.generate_human_player(**llm_kw)
+            checkpoint(
+                "human_player",
+                {
+                    "human_player": generator.lore["human_player"],
+                    "start_location": generator.lore["start_location"],
+                },
+            )
+
+        # ----- Generating NPCs -----
+        if "npc" not in generator.lore:
+            msg = f"Generating {num_npc} NPC(s)"
+            logger.info(msg)
+            console.print(msg)
+            with console.status(waiting):
+                generator.generate_npcs_batched(
+                    num_chars=num_npc, batch_size=npc_batch_size, temperature=temp_npc_gen
+                )
+            checkpoint(
+                "npc",
+                {
+                    "npc": generator.lore["npc"],
+                    "start_location": generator.lore["start_location"],
+                },
+            )
+
+        # ----- Generating action rules for the NPCs -----
+        if "npc_rules" not in generator.lore:
+            msg = f"Generation action rules for the NPCs"
+            logger.info(msg)
+            console.print(msg)
+            with console.status(waiting):
+                runner.run(
+                    generator.agenerate_npc_action_rules(
+                        num_rules_per_category=num_npc_rules_per_category,
+                        max_workers=max_workers,
+                        max_retries=max_retries,
+                        temperature=temp_action_rules,
+                    )
+                )
+            checkpoint("npc_rules", {"npc_rules": generator.lore["npc_rules"]})
 
-    # ----- Starting point -----
-    msg = f"Generating the starting point"
-    logger.info(msg)
-    console_manager.console.print(msg)
-    generator.gen_starting_point(**llm_kw)
-    with open(os.path.join(save_location, f"lore.json"), "w") as f:
-        json.dump(generator.lore, f, indent=4)
+        # ----- Starting point -----
+        if "start" not in generator.lore:
+            msg = f"Generating the starting point"
+            logger.info(msg)
+            console.print(msg)
+            # free text, so it is streamed to the user as it is generated
+            generator.gen_starting_point(
+                on_token=lambda token: console.print(token, end="", markup=False),
+                **llm_kw,
+            )
+            console.print()
+            checkpoint("start", {"start": generator.lore["start"]})
 
     logger.info("Saving the lore")
-    with open(os.path.join(save_location, f"lore.json"), "w") as f:
-        json.dump(generator.lore, f, indent=4)
+    _dump(generator.lore, lore_path)
 
     logger.info("Saving the generation prompts")
-    with open(os.path.join(save_location, f"gen_lore_params.json"), "w") as f:
-        json.dump(generator.game_gen_params, f, indent=4)
+    _dump(generator.game_gen_params, params_path)
 
     # Log summary
     generator.log_generation_summary()
@@ -1,28 +1,14 @@
+import argparse
 import json
 import os
 import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import logging
 
+# the project is not an installable package: "python llm_rpg/app/main.py" is run
+# from the project root, which must be importable
 sys.path.append(os.getcwd())
 
-from llm_rpg.utils.config_loader import load_config
-from llm_rpg.engine.io import IO
-from llm_rpg.gui.console_manager import ConsoleManager
-from llm_rpg.gui.game_menu import GameMenu
-from llm_rpg.gui.chat import RPGChatInterface
-from llm_rpg.utils.mock_functions import user_input_process_mock, ai_response_mock
-
-from llm_rpg.app.lore_generator import GenerateLore
-from llm_rpg.engine.memory import GameMemory
-
-from llm_rpg.utils.config import setup_llms, get_lore_generation_params
-from llm_rpg.utils.logger import set_logger
-
-
-from llm_rpg.engine.game_ai import GameAI
-
 # ----- Some testing flags -----
 TEST_MAIN_MENU = True
 
@@ -41,19 +27,51 @@ class InputProcessingStatus(str, Enum):
     CONTINUE = "continue"
 
 
-if __name__ == "__main__":
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="NeuroQuest, LLM powered textual RPG game")
+    parser.add_argument(
+        "--config",
+        default=os.path.join(os.getcwd(), "configs", "working_cfg.json"),
+        help="path to the config file",
+    )
+    return parser.parse_args()
+
+
+def setup_paths(config: dict) -> tuple[str, str, str]:
+    """
+    Creates the game folders in one go
+    :return: (game folder, log folder, saved games folder)
+    """
+    from llm_rpg.utils.helpers import ensure_dirs
+
+    paths = config["paths"]
+    ensure_dirs(paths["game_folder"], paths["log_folder"], paths["saved_games_folder"])
+    return paths["game_folder"], paths["log_folder"], paths["saved_games_folder"]
+
+
+def main(config_path: str) -> None:
+    # The heavy imports (LLM SDKs, pandas, SQLAlchemy, rich) are done here and not at
+    # the module level, so importing this module or running --help stays cheap
+    from dotenv import load_dotenv
+
+    from llm_rpg.utils.config_loader import load_config
+    from llm_rpg.engine.io import IO
+    from llm_rpg.gui.console_manager import ConsoleManager
+    from llm_rpg.gui.game_menu import GameMenu
+
+    from llm_rpg.app.lore_generator import GenerateLore
+    from llm_rpg.engine.memory import GameMemory
+
+    from llm_rpg.utils.config import LLM_TYPES, setup_llms, get_lore_generation_params
+    from llm_rpg.utils.logger import set_logger
+
+    from llm_rpg.engine.game_ai import GameAI
+
     # ----- Configuration Setup -----
-    config_path = os.path.join(os.getcwd(), "configs", "working_cfg.json")
     config = load_config(config_path)
 
     # ----- Setup Paths -----
-    os.makedirs(config["paths"]["game_folder"], exist_ok=True)
-    os.makedirs(config["paths"]["log_folder"], exist_ok=True)
-    os.makedirs(config["paths"]["saved_games_folder"], exist_ok=True)
-
-    cwd = config["paths"]["game_folder"]
-    log_folder = config["paths"]["log_folder"]
-    game_folder = config["paths"]["saved_games_folder"]
+    cwd, log_folder, game_folder = setup_paths(config)
 
     # ----- Current date -----
     dt_now = datetime.now().strftime("%Y-%m-%d")
@@ -61,35 +79,29 @@ if __name__ == "__main__":
     # ----- Set up the log stream into a file -----
     log_stream_file = os.path.join(log_folder, f"game-log_{dt_now}.log")
     logger = set_logger(level=logging.INFO, output=log_stream_file)
-    logger.info(f"{'-' * 10} Starting new game /{dt_now}/ {'-' * 10}")
+    logger.info("%s Starting new game /%s/ %s", "-" * 10, dt_now, "-" * 10)
 
     # ----- Load environment variables -----
     dotenv_path = config.get("dotenv_path") or ".env"
     load_dotenv(dotenv_path=dotenv_path)
-    logger.info(f"Loaded dotenv file from {dotenv_path}")
+    logger.info("Loaded dotenv file from %s", dotenv_path)
 
     # ----- Setup LLMs -----
-    llm_clients = setup_llms(config)
+    llm_clients = setup_llms(config, config_path=config_path)
     lore_llm = llm_clients["lore_llm"]
     npc_ai_llm = llm_clients["npc_ai_llm"]
     game_ai_llm = llm_clients["game_ai_llm"]
     input_validator_llm = llm_clients.get("input_validator", None)
 
     # ----- Get LLM-specific parameters -----
-    def get_llm_props(llm_type: str) -> dict | None:
-        llm_config = config.get("llm_providers", {}).get(llm_type)
-        return llm_config.get("props") if llm_config else None
-
-    lore_llm_kw = get_llm_props("lore_llm")
-    npc_llm_kw = get_llm_props("npc_ai_llm")
-    game_ai_llm_kw = get_llm_props("game_ai_llm")
-    input_validator_kw = get_llm_props("input_validator")
-    llms_kwargs = {
-        "lore_llm": lore_llm_kw,
-        "npc_ai_llm": npc_llm_kw,
-        "game_ai_llm": game_ai_llm_kw,
-        "input_validator": input_validator_kw,
-    }
+    # look up each provider config once
+    llm_providers = config.get("llm_providers", {})
+    llms_kwargs = {}
+    for llm_type in LLM_TYPES:
+        llm_config = llm_providers.get(llm_type)
+        llms_kwargs[llm_type] = llm_config.get("props") if llm_config else None
+
+    lore_llm_kw = llms_kwargs["lore_llm"]
 
     # ----- Game IO ----
     game_io = IO(game_folder)
@@ -104,7 +116,7 @@ if __name__ == "__main__":
         game_lore = {}
 
         if result["new_game"]:
-            logger.info(f"Generating new game")
+            logger.info("Generating new game")
             console_manager.console.print(
                 f"{'=' * 15} Generating the new game {'=' * 15}"
             )
@@ -112,8 +124,8 @@ if __name__ == "__main__":
             game_id = game_io.id
             game_folder = game_io.dst
             memory_db_path = os.path.join(game_folder, "memory.sql")
-            logger.info(f"Game folder: {game_folder}")
-            logger.info(f"Game memory db will be located at {memory_db_path}")
+            logger.info("Game folder: %s", game_folder)
+            logger.info("Game memory db will be located at %s", memory_db_path)
 
             # Get lore generation parameters from config and user input
             lore_config = get_lore_generation_params(config, result["new_game_params"])
@@ -128,9 +140,9 @@ if __name__ == "__main__":
             )
 
             # add description to the game
-            cond = game_io.games["id"] == game_id
-            game_io.games.loc[cond, "description"] = (
-                f"{game_lore_raw['world']['name']} -- {game_lore_raw['world']['description']}"
+            game_io.set_description(
+                game_id,
+                f"{game_lore_raw['world']['name']} -- {game_lore_raw['world']['description']}",
             )
             game_io.save_games()
 
@@ -141,15 +153,37 @@ if __name__ == "__main__":
             console_manager.console.print(f"{'=' * 15} Ready! {'=' * 15}")
 
         if not result["new_game"] and result["load_game"] >= 0:
-            logger.info(f"Loading the game")
-            row_num = result["load_game"]
-            _row = game_io.games.iloc[row_num]
+            logger.info("Loading the game")
+            load_row = result["load_game"]
+            _row = game_io.games[load_row]
             game_id = _row["id"]
             game_folder = _row["folder"]
             memory_db_path = os.path.join(game_folder, "memory.sql")
-
-            with open(os.path.join(game_folder, "lore.json"), "r") as f:
-                game_lore_raw = json.load(f)
+            lore_path = os.path.join(game_folder, "lore.json")
+            lore_config_path = os.path.join(game_folder, "lore_config.json")
+
+            if not os.path.exists(lore_path) and os.path.exists(lore_config_path):
+                # the lore generation was interrupted: GenerateLore picks up the
+                # checkpoints in "lore.jsonl" and generates only the missing stages
+                logger.info("Resuming the lore generation of %s", game_folder)
+                with open(lore_config_path, "r") as f:
+                    lore_config = json.load(f)
+                game_lore_raw = GenerateLore(
+                    lore_llm,
+                    lore_config,
+                    game_folder,
+                    console_manager,
+                    config,
+                    **lore_llm_kw,
+                )
+                game_io.set_description(
+                    game_id,
+                    f"{game_lore_raw['world']['name']} -- {game_lore_raw['world']['description']}",
+                )
+                game_io.save_games()
+            else:
+                with open(lore_path, "r") as f:
+                    game_lore_raw = json.load(f)
 
             memory = GameMemory(db_path=memory_db_path,
                                 llm_client=game_ai_llm,
@@ -168,8 +202,8 @@ if __name__ == "__main__":
         )
 
     if TEST_GAME_AI:
-        logger.info(f"Loading the game")
-        _row = game_io.games.iloc[row_num - 1]
+        logger.info("Loading the game")
+        _row = game_io.games[row_num - 1]
         game_id = _row["id"]
         game_folder = _row["folder"]
         memory_db_path = os.path.join(game_folder, "memory.sql")
@@ -216,6 +250,9 @@ if __name__ == "__main__":
                     console_manager.console.print(char, end="\r")
 
     if TEST_CHAT1:
+        from llm_rpg.gui.chat import RPGChatInterface
+        from llm_rpg.utils.mock_functions import user_input_process_mock, ai_response_mock
+
         # TODO: Continue with chat interface setup...
         chat_interface = RPGChatInterface(console_manager)
         chat_interface.register_command_hooks(
@@ -240,3 +277,8 @@ if __name__ == "__main__":
     # if TEST_CHAT2:
     #    chat_interface = ChatInterface2(console_manager)
     #    chat_interface.set_game_ai(game_ai)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.config)
@@ -0,0 +1,276 @@
+"""
+Client wrapper that caches LLM responses in memory and, optionally, on disk, so that
+repeated prompts within a run or across runs (e.g. lore generation with an unchanged
+config) do not pay the LLM latency again.
+"""
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Dict, Any, Tuple, Iterator, AsyncIterator
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+import pydantic
+
+from llm_rpg.templates.base_client import BaseClient, LLMResponse, schema_json
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class CachingClient(BaseClient):
+    """
+    Exact-match response cache around any BaseClient.
+
+    The cache key is sha256(model | messages | schema | call kwargs). Entries are kept in an
+    in-memory LRU and, if cache_dir is given, each key is also stored as one JSON file in
+    cache_dir. Calls with temperature == 0 are deterministic and reuse the first stored
+    response. For other temperatures up to pool_size different responses are collected per
+    key and, once the pool is full, a random one is returned instead of calling the LLM.
+    With pool_size 0 only temperature == 0 calls are cached, the others always go to the
+    LLM, so sampled text is never replayed.
+
+    Concurrent temperature == 0 calls with the same key go to the LLM once: the first
+    one makes the call, the others wait for it and are served from the cache.
+    """
+
+    def __init__(self,
+                 client: BaseClient,
+                 cache_dir: str | None = None,
+                 pool_size: int = 1,
+                 max_entries: int = 1024,
+                 ttl: float | None = None,
+                 refresh: bool = False):
+        """
+        :param client: BaseClient -- the wrapped LLM client
+        :param cache_dir: str -- folder to keep cached responses in, None for memory only
+        :param pool_size: int -- number of responses to collect per key for temperature > 0,
+                                 0 to cache only temperature == 0 calls
+        :param max_entries: int -- keys kept in memory, the least recently used are dropped
+        :param ttl: float -- seconds an in-memory entry stays valid, None for no expiry
+        :param refresh: bool -- the cached responses are not used, the new ones replace them
+        """
+        super().__init__(getattr(client, "model_name", None))
+        self.client = client
+        self.default_concurrency = getattr(client, "default_concurrency", self.default_concurrency)
+        self.cache_dir = cache_dir
+        self.pool_size = max(0, pool_size)
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.refresh = refresh
+        # key -> (time stored, pool)
+        self._mem: OrderedDict[str, Tuple[float, List[Dict[str, Any]]]] = OrderedDict()
+        self._lock = threading.Lock()
+        # keys with an LLM call in flight -> set once the call is over
+        self._inflight: Dict[str, threading.Event] = {}
+        self._ainflight: Dict[str, asyncio.Event] = {}
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def set_model(self, model_name: str) -> Any:
+        self.model_name = model_name
+        return self.client.set_model(model_name)
+
+    def _key(self, kind: str, messages: List[Dict[Any, Any]], response_model, kwargs: Dict[str, Any]) -> str:
+        schema = schema_json(response_model) if response_model is not None else None
+        payload = json.dumps(
+            {
+                "kind": kind,
+                "model": self.model_name,
+                "messages": messages,
+                "schema": schema,
+                "kwargs": kwargs,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _mem_get(self, key: str) -> List[Dict[str, Any]] | None:
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._mem[key]
+                return None
+            self._mem.move_to_end(key)
+            return entry[1]
+
+    def _mem_put(self, key: str, pool: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._mem[key] = (time.monotonic(), pool)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def _read_pool(self, key: str) -> List[Dict[str, Any]]:
+        pool = self._mem_get(key)
+        if pool is not None:
+            return pool
+        if self.cache_dir is None:
+            return []
+        try:
+            with open(self._path(key), "r") as f:
+                pool = json.loads(f.read())
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.warning('Could not read cached response "%s": %s', key, e)
+            return []
+        self._mem_put(key, pool)
+        return pool
+
+    def _cacheable(self, temperature: float | None) -> bool:
+        return temperature == 0 or self.pool_size > 0
+
+    def _lookup(self, key: str, temperature: float | None) -> Dict[str, Any] | None:
+        if self.refresh:
+            return None
+        pool = self._read_pool(key)
+        if not pool:
+            return None
+        if temperature == 0:
+            return pool[0]
+        if len(pool) < self.pool_size:
+            # keep collecting different samples until the pool is full
+            return None
+        return random.choice(pool)
+
+    def _store(self, key: str, response: Dict[str, Any]) -> None:
+        pool = ([] if self.refresh else self._read_pool(key)) + [response]
+        self._mem_put(key, pool)
+        if self.cache_dir is None:
+            return
+        try:
+            with open(self._path(key), "w") as f:
+                f.write(json.dumps(pool, default=str))
+        except Exception as e:
+            logger.warning('Could not cache response "%s": %s', key, e)
+
+    def _cached_chat(self, key: str, kwargs: Dict[str, Any]) -> LLMResponse | None:
+        cached = self._lookup(key, kwargs.get("temperature"))
+        if cached is None:
+            return None
+        logger.debug("LLM cache hit: %s", key)
+        # a copy, the pooled response is shared with the next hits
+        return {**cached}
+
+    def _cached_struct(self, key: str, response_model: pydantic.BaseModel, kwargs: Dict[str, Any]) -> LLMResponse | None:
+        cached = self._lookup(key, kwargs.get("temperature"))
+        if cached is None:
+            return None
+        logger.debug("LLM cache hit: %s", key)
+        return {**cached, "message": response_model.model_validate(cached["message"])}
+
+    def _store_struct(self, key: str, response: LLMResponse) -> None:
+        # failed extractions are not cached, the caller may retry
+        if response.get("message") is not None:
+            self._store(key, {**response, "message": response["message"].model_dump()})
+
+    @contextmanager
+    def _single_flight(self, key: str, temperature: float | None) -> Iterator[bool]:
+        """
+        Yields True if this call shall go to the LLM, False after waiting for the call
+        of another thread with the same key: the caller then looks up the cache again.
+        """
+        if temperature != 0:
+            yield True
+            return
+        with self._lock:
+            event = self._inflight.get(key)
+            if event is None:
+                self._inflight[key] = event = threading.Event()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            event.wait()
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    @asynccontextmanager
+    async def _asingle_flight(self, key: str, temperature: float | None) -> AsyncIterator[bool]:
+        """Same as _single_flight() for the tasks of the running event loop"""
+        if temperature != 0:
+            yield True
+            return
+        event = self._ainflight.get(key)
+        if event is not None:
+            await event.wait()
+            yield False
+            return
+        self._ainflight[key] = event = asyncio.Event()
+        try:
+            yield True
+        finally:
+            del self._ainflight[key]
+            event.set()
+
+    def chat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> LLMResponse:
+        if not self._cacheable(kwargs.get("temperature")):
+            return self.client.chat(messages, *args, **kwargs)
+        key = self._key("chat", messages, None, kwargs)
+        while (cached := self._cached_chat(key, kwargs)) is None:
+            with self._single_flight(key, kwargs.get("temperature")) as leader:
+                if leader:
+                    response = self.client.chat(messages, *args, **kwargs)
+                    self._store(key, response)
+                    return response
+        return cached
+
+    async def achat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> LLMResponse:
+        """Same as chat(), a miss goes to the wrapped client's async call"""
+        if not self._cacheable(kwargs.get("temperature")):
+            return await self.client.achat(messages, *args, **kwargs)
+        key = self._key("chat", messages, None, kwargs)
+        while (cached := self._cached_chat(key, kwargs)) is None:
+            async with self._asingle_flight(key, kwargs.get("temperature")) as leader:
+                if leader:
+                    response = await self.client.achat(messages, *args, **kwargs)
+                    self._store(key, response)
+                    return response
+        return cached
+
+    def struct_output(self, messages: List[Dict[Any, Any]], response_model: pydantic.BaseModel, **kwargs) -> LLMResponse:
+        if not self._cacheable(kwargs.get("temperature")):
+            return self.client.struct_output(messages, response_model, **kwargs)
+        key = self._key("struct_output", messages, response_model, kwargs)
+        while (cached := self._cached_struct(key, response_model, kwargs)) is None:
+            with self._single_flight(key, kwargs.get("temperature")) as leader:
+                if leader:
+                    response = self.client.struct_output(messages, response_model, **kwargs)
+                    self._store_struct(key, response)
+                    return response
+        return cached
+
+    async def astruct_output(self, messages: List[Dict[Any, Any]], response_model: pydantic.BaseModel, **kwargs) -> LLMResponse:
+        """Same as struct_output(), a miss goes to the wrapped client's async call"""
+        if not self._cacheable(kwargs.get("temperature")):
+            return await self.client.astruct_output(messages, response_model, **kwargs)
+        key = self._key("struct_output", messages, response_model, kwargs)
+        while (cached := self._cached_struct(key, response_model, kwargs)) is None:
+            async with self._asingle_flight(key, kwargs.get("temperature")) as leader:
+                if leader:
+                    response = await self.client.astruct_output(messages, response_model, **kwargs)
+                    self._store_struct(key, response)
+                    return response
+        return cached
+
+    def stream(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> Any:
+        """Streaming is passed through without caching"""
+        return self.client.stream(messages, *args, **kwargs)
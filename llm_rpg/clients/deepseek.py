@@ -1,19 +1,58 @@
-from markdown_it.common.utils import escapeHtml
-
 from llm_rpg.templates.base_client import BaseClient
 from typing import List, Dict, Any, Union, Optional, Type, Generator
 import pydantic
 from pydantic import BaseModel
 import json
-import requests
+
+try:
+    import orjson
+    F_IS_ORJSON = True
+except ImportError:
+    F_IS_ORJSON = False
+
+# HTTP/2 for streaming needs httpx with the h2 extra, requests is used otherwise
+try:
+    import httpx
+    import h2  # noqa: F401
+    F_IS_HTTP2 = True
+except ImportError:
+    F_IS_HTTP2 = False
+
+# orjson parses bytes directly, its JSONDecodeError is a subclass of json.JSONDecodeError
+_json_loads = orjson.loads if F_IS_ORJSON else json.loads
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Request body as UTF-8 JSON bytes, the sessions already send the JSON content type"""
+    return orjson.dumps(obj) if F_IS_ORJSON else json.dumps(obj).encode("utf-8")
+
+# durations are not reported by DeepSeek, only the token counts change per call
+_STATS_BASE = {
+    'prompt_tokens': 0,
+    'prompt_eval_duration': -1,
+    'eval_tokens': 0,
+    'eval_duration': -1,
+    'total_tokens': 0,
+}
+
+
+def _ds_stats(prompt_tokens: int, eval_tokens: int, total_tokens: int,
+              cached_tokens: int | None = None) -> Dict[str, Any]:
+    stats = _STATS_BASE.copy()
+    stats['prompt_tokens'] = prompt_tokens
+    stats['eval_tokens'] = eval_tokens
+    stats['total_tokens'] = total_tokens
+    # prompt tokens served from DeepSeek's prefix (context) cache
+    if cached_tokens is not None:
+        stats['cached_tokens'] = cached_tokens
+    return stats
 
 # --------------------------- Custom ValidationError for failed validation of Pydantic Model ---------------------------
 class ValidationError(Exception):
-    def __init__(self, message):
-        super().__init__(message)
+    __slots__ = ()
 
     def __str__(self):
-        return f"{self.message} (Error Code: {self.error_code})"
+        return self.args[0] if self.args else ""
 
 # --- Thank you, DeepSeek
 # -------------------------------- requests based client --------------------------------
@@ -35,13 +74,39 @@ class DeepSeekW_requests(BaseClient):
         self.is_reasoner = "reasoner" in model_name.lower()
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
         }
+        # (connect, read) timeouts in seconds
+        self.timeout = kwargs.get('timeout', (3.05, 120))
+
+        # imported here, the module is loaded for the OpenAI based client too
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # one session for all the calls: the TCP/TLS connection is set up once and then reused
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4,
+                              pool_maxsize=8,
+                              max_retries=Retry(total=2, backoff_factor=0.2))
+        self._session.mount("https://", adapter)
+
+        # streams are multiplexed over one HTTP/2 connection when httpx/h2 are installed
+        self._hclient = None
+        if F_IS_HTTP2:
+            connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+            self._hclient = httpx.Client(
+                http2=True,
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=httpx.Timeout(connect=connect, read=read, write=10.0, pool=None),
+                limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+            )
 
         # default temperature
-        self._T = 1.0
-        if 'temperature' in kwargs:
-            self._T = kwargs['temperature']
+        self._T = kwargs.get('temperature', 1.0)
 
     def set_model(self, model_name: str) -> None:
         """
@@ -52,10 +117,27 @@ class DeepSeekW_requests(BaseClient):
         self.model_name = model_name
         self.is_reasoner = "reasoner" in model_name.lower()
 
+    def close(self) -> None:
+        """Closes the pooled connections"""
+        self._session.close()
+        if self._hclient is not None:
+            self._hclient.close()
+
+    def __enter__(self) -> "DeepSeekW_requests":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        for client in (getattr(self, "_session", None), getattr(self, "_hclient", None)):
+            if client is not None:
+                client.close()
+
     def _make_request(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Helper method to make API requests"""
         url = f"{self.base_url}/{endpoint}"
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._session.post(url, data=_json_dumps(payload), timeout=self.timeout)
         response.raise_for_status()
         return response.json()
 
@@ -79,13 +161,10 @@ class DeepSeekW_requests(BaseClient):
 
         result = {
             "message": response["choices"][0]["message"]["content"],
-            "stats": {
-                'prompt_tokens': response["usage"]["prompt_tokens"],
-                'prompt_eval_duration': -1,  # Not supported by DS
-                'eval_tokens': response["usage"]["completion_tokens"],
-                'eval_duration': -1,  # Not supported by DS
-                'total_tokens': response["usage"]["total_tokens"]
-            }
+            "stats": _ds_stats(response["usage"]["prompt_tokens"],
+                               response["usage"]["completion_tokens"],
+                               response["usage"]["total_tokens"],
+                               response["usage"].get("prompt_cache_hit_tokens"))
         }
 
         if self.is_reasoner:
@@ -95,6 +174,20 @@ class DeepSeekW_requests(BaseClient):
 
         return result
 
+    def _stream_lines(self, payload: Dict[str, Any]) -> Generator[bytes, None, None]:
+        """Raw SSE lines of a streamed completion, over HTTP/2 when available"""
+        if self._hclient is not None:
+            with self._hclient.stream("POST", "/chat/completions", content=_json_dumps(payload)) as response:
+                response.raise_for_status()
+                yield from self.split_lines(response.iter_bytes())
+            return
+
+        url = f"{self.base_url}/chat/completions"
+        with self._session.post(url, data=_json_dumps(payload), stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            # chunk_size=None hands over the data as it arrives, a fixed size would wait to fill it
+            yield from self.split_lines(response.iter_content(chunk_size=None))
+
     def stream(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> Generator[Dict[str, Any], None, None]:
         """
         Streams responses from DeepSeek API with proper error handling.
@@ -107,44 +200,39 @@ class DeepSeekW_requests(BaseClient):
             **kwargs
         }
 
-        url = f"{self.base_url}/chat/completions"
-        with requests.post(url, headers=self.headers, json=payload, stream=True) as response:
-            response.raise_for_status()
+        for line in self._stream_lines(payload):
+            # Skip empty lines and keep-alive messages
+            if not line or line == b': OPENROUTER PROCESSING':
+                continue
 
-            for line in response.iter_lines():
-                # Skip empty lines and keep-alive messages
-                if not line or line == b': OPENROUTER PROCESSING':
-                    continue
+            try:
+                # Remove 'data: ' prefix if present, the line is parsed as bytes
+                if line.startswith(b'data: '):
+                    line = line[6:].strip()
 
-                try:
-                    # Remove 'data: ' prefix if present
-                    line_str = line.decode('utf-8')
-                    if line_str.startswith('data: '):
-                        line_str = line_str[6:].strip()
-
-                    # Skip empty data messages
-                    if not line_str or line_str == '[DONE]':
-                        continue
-
-                    chunk = json.loads(line_str)
-
-                    if self.is_reasoner:
-                        yield {
-                            "content": chunk["choices"][0]["delta"].get("content", ""),
-                            "reasoning": chunk["choices"][0]["delta"].get("reasoning_content", "")
-                        }
-                    else:
-                        content = chunk["choices"][0]["delta"].get("content", "")
-                        if content:  # Only yield non-empty content
-                            yield content
-
-                except json.JSONDecodeError as e:
-                    print(f"Failed to decode chunk: {line_str}. Error: {e}")
-                    continue
-                except KeyError as e:
-                    print(f"Malformed chunk missing expected keys: {chunk}. Error: {e}")
+                # Skip empty data messages
+                if not line or line == b'[DONE]':
                     continue
 
+                chunk = _json_loads(line)
+
+                if self.is_reasoner:
+                    yield {
+                        "content": chunk["choices"][0]["delta"].get("content", ""),
+                        "reasoning": chunk["choices"][0]["delta"].get("reasoning_content", "")
+                    }
+                else:
+                    content = chunk["choices"][0]["delta"].get("content", "")
+                    if content:  # Only yield non-empty content
+                        yield content
+
+            except json.JSONDecodeError as e:
+                print(f"Failed to decode chunk: {line!r}. Error: {e}")
+                continue
+            except KeyError as e:
+                print(f"Malformed chunk missing expected keys: {chunk}. Error: {e}")
+                continue
+
     def struct_output(self,
                       messages: List[Dict[Any, Any]],
                       pydantic_model: pydantic.BaseModel,
@@ -162,8 +250,8 @@ class DeepSeekW_requests(BaseClient):
         except Exception as e:
             system_message = []
 
-        # Insert the system message at the beginning
-        messages_with_instruction = system_message + messages
+        # Insert the system message after the shared system prefix
+        messages_with_instruction = self.add_struct_system(messages, system_message)
 
         payload = {
             "model": self.model_name,
@@ -181,21 +269,18 @@ class DeepSeekW_requests(BaseClient):
         
         # Parse the JSON content
         try:
-            json_content = json.loads(clean_json_str)
-            structured_message = pydantic_model(**json_content)
-        except (json.JSONDecodeError, pydantic.ValidationError) as e:
-            raise ValidationError(f"Failed to parse or validate structured output: {str(e)}")
+            # parsed and validated in one pass, invalid JSON is a ValidationError too
+            structured_message = pydantic_model.model_validate_json(clean_json_str)
+        except pydantic.ValidationError as e:
+            raise ValidationError(f"Failed to parse or validate structured output: {str(e)}") from e
 
         # Build the result dictionary
         result = {
             "message": structured_message,
-            "stats": {
-                'prompt_tokens': response["usage"]["prompt_tokens"],
-                'prompt_eval_duration': -1,
-                'eval_tokens': response["usage"]["completion_tokens"],
-                'eval_duration': -1,
-                'total_tokens': response["usage"]["total_tokens"]
-            }
+            "stats": _ds_stats(response["usage"]["prompt_tokens"],
+                               response["usage"]["completion_tokens"],
+                               response["usage"]["total_tokens"],
+                               response["usage"].get("prompt_cache_hit_tokens"))
         }
 
         # Add reasoning if available
@@ -210,7 +295,6 @@ class DeepSeekW_requests(BaseClient):
 # -------------------------------- Open AI client based on --------------------------------
 from llm_rpg.templates.base_client import BaseClient
 from typing import List, Dict, Any, Union, Optional, Type
-from openai import OpenAI
 import pydantic
 import json
 
@@ -228,18 +312,23 @@ class DeepSeekW_OAI(BaseClient):
         :param api_key: Your DeepSeek API key
         :param base_url: DeepSeek API base URL
         """
+        # the SDK is imported on first use, runs with other providers do not load it
+        from openai import OpenAI
+
+        from llm_rpg.utils.http_clients import http2_client
+
+        # one HTTP/2 connection for all the calls when h2 is installed, the SDK default otherwise
         self.client = OpenAI(
             api_key=api_key,
-            base_url="https://api.deepseek.com/"
+            base_url="https://api.deepseek.com/",
+            http_client=http2_client(),
         )
         self.model_name = model_name
         self.is_reasoner = "reasoner" in model_name.lower()
 
         # default temperature
         # https://api-docs.deepseek.com/quick_start/parameter_settings
-        self._T = 1.0
-        if 'temperature' in kwargs:
-            self._T = kwargs['temperature']
+        self._T = kwargs.get('temperature', 1.0)
 
     def set_model(self, model_name: str) -> None:
         """
@@ -268,13 +357,10 @@ class DeepSeekW_OAI(BaseClient):
 
         result = {
             "message": response.choices[0].message.content,
-            "stats": {
-                'prompt_tokens': response.usage.prompt_tokens,
-                'prompt_eval_duration': -1,  # Not supported by DS
-                'eval_tokens': response.usage.completion_tokens,
-                'eval_duration': -1,  # Not supported by DS
-                'total_tokens': response.usage.total_tokens
-            }
+            "stats": _ds_stats(response.usage.prompt_tokens,
+                               response.usage.completion_tokens,
+                               response.usage.total_tokens,
+                               getattr(response.usage, "prompt_cache_hit_tokens", None))
         }
 
         if self.is_reasoner:
@@ -319,13 +405,10 @@ class DeepSeekW_OAI(BaseClient):
         :return: Dictionary with structured message, stats, and reasoning
         """
         # Add instruction to format output as JSON matching the pydantic model
-        system_message = {
-            "role": "system",
-            "content": f"""You MUST output a JSON object that strictly follows this schema: {json.dumps(pydantic_model.model_json_schema())}"""
-        }
+        system_message = self.json_object_system(pydantic_model)
 
-        # Insert the system message at the beginning
-        messages_with_instruction = [system_message] + messages
+        # Insert the system message after the shared system prefix
+        messages_with_instruction = self.add_struct_system(messages, system_message)
 
         # Get the response from DeepSeek
         response = self.client.chat.completions.create(
@@ -341,21 +424,18 @@ class DeepSeekW_OAI(BaseClient):
         
         # Parse the JSON content
         try:
-            json_content = json.loads(clean_json_str)
-            structured_message = pydantic_model(**json_content)
-        except (json.JSONDecodeError, pydantic.ValidationError) as e:
-            raise ValueError(f"Failed to parse or validate structured output: {str(e)}")
+            # parsed and validated in one pass, invalid JSON is a ValidationError too
+            structured_message = pydantic_model.model_validate_json(clean_json_str)
+        except pydantic.ValidationError as e:
+            raise ValueError(f"Failed to parse or validate structured output: {str(e)}") from e
 
         # Build the result dictionary
         result = {
             "message": structured_message,
-            "stats": {
-                'prompt_tokens': response.usage.prompt_tokens,
-                'prompt_eval_duration': -1,
-                'eval_tokens': response.usage.completion_tokens,
-                'eval_duration': -1,
-                'total_tokens': response.usage.total_tokens
-            }
+            "stats": _ds_stats(response.usage.prompt_tokens,
+                               response.usage.completion_tokens,
+                               response.usage.total_tokens,
+                               getattr(response.usage, "prompt_cache_hit_tokens", None))
         }
 
         # Add reasoning if available
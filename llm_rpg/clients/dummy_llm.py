@@ -1,49 +1,54 @@
 import random
 import time
+from bisect import bisect_right
+from itertools import accumulate
 from typing import Dict, List, Any, Generator
 
 
 class DummyLLM:
-    def __init__(self, is_reasoner: bool = False):
+    # the factory builds a new instance for every fallback, they stay small without __dict__
+    __slots__ = ("is_reasoner", "_rng", "_randint", "_choices", "total_length", "sleep_s")
+
+    word_pool = ("The", "quick", "brown", "fox", "jumps", "over", "the", "lazy", "dog",
+                 "Python", "code", "generation", "example", "streaming", "response",
+                 "artificial", "intelligence", "language", "model", "hello", "world")
+
+    def __init__(self, is_reasoner: bool = False, seed: int | None = None):
         """
         Initialize the DummyLLM.
 
         :param is_reasoner: Whether to include reasoning in responses
+        :param seed: Seed of the instance's own random generator, for reproducible fakes
         """
         self.is_reasoner = is_reasoner
-        self.total_length = random.randint(20, 80)
-        self.word_pool = ["The", "quick", "brown", "fox", "jumps", "over", "the", "lazy", "dog",
-                     "Python", "code", "generation", "example", "streaming", "response",
-                     "artificial", "intelligence", "language", "model", "hello", "world"]
+        self._rng = random.Random(seed)
+        self._randint = self._rng.randint
+        self._choices = self._rng.choices
+        self.total_length = self._randint(20, 80)
         self.sleep_s = 0.05
 
     def chat(self, messages: List[Dict[Any, Any]], *args, **kwargs):
         """Emulates fake response"""
-        prompt_words = 0
-        for msg in messages:
-            prompt_words += len(msg.split(' '))
+        # messages are dicts; str.count() does not build the word list split() would
+        prompt_words = sum(m["content"].count(' ') + 1 for m in messages if m.get("content"))
         response = {
             'message': self._gen_fake_content(),
             "stats": {
                 'prompt_tokens': prompt_words,
-                'prompt_eval_duration': random.randint(1, 100),
-                'eval_tokens': random.randint(1, prompt_words),
-                'eval_duration': random.randint(1, 100),
+                'prompt_eval_duration': self._randint(1, 100),
+                'eval_tokens': self._randint(1, max(1, prompt_words)),
+                'eval_duration': self._randint(1, 100),
             }
         }
         return  response
 
     def _gen_fake_content(self):
-        """Generates a fake content by randomly choosing words till the max lenght is reached"""
-        content_parts = []
-        remaining_length = self.total_length
-        while remaining_length > 0:
-            word = random.choice(self.word_pool)
-            if len(word) + (1 if content_parts else 0) <= remaining_length:
-                content_parts.append(word)
-                remaining_length -= len(word) + (1 if content_parts else 0)
-
-        return " ".join(content_parts)
+        """Generates a fake content of random words, as many as fit into the max length"""
+        # every word is at least 3 characters + a space, so this many words always fill the length
+        words = self._choices(self.word_pool, k=self.total_length // 4 + 1)
+        # lengths with the trailing space, a prefix fits while its total is <= max length + 1
+        ends = list(accumulate(len(w) + 1 for w in words))
+        return " ".join(words[:bisect_right(ends, self.total_length + 1)])
 
     def stream(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> Generator[Any, None, None]:
         """
@@ -55,15 +60,22 @@ class DummyLLM:
 
         full_content = self._gen_fake_content()
 
-        # Split into chunks of random size (1-5 characters)
-        position = 0
-        while position < len(full_content):
-            chunk_size = random.randint(1, 5)
-            chunk = full_content[position:position + chunk_size]
-            position += chunk_size
+        # Chunks of random size (1-5 characters), boundaries are drawn at once
+        sizes = self._choices(range(1, 6), k=len(full_content))
+        bounds = [0, *accumulate(sizes)]
+
+        # Chunks are emitted on a fixed schedule to emulate network; a late consumer
+        # does not pay the delay again, the stream catches up with the schedule
+        next_tick = time.monotonic() + self.sleep_s
+        for start, end in zip(bounds, bounds[1:]):
+            if start >= len(full_content):
+                break
+            chunk = full_content[start:end]
 
-            # Add small delay to emulate network
-            time.sleep(self.sleep_s)
+            now = time.monotonic()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+            next_tick += self.sleep_s
 
             if self.is_reasoner:
                 # For reasoning mode, yield a dictionary
@@ -73,4 +85,4 @@ class DummyLLM:
                 }
             else:
                 # Normal mode, just yield the content chunk
-                yield chunk
\ No newline at end of file
+                yield chunk
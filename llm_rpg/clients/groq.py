@@ -1,13 +1,15 @@
-from typing import List, Dict, Any
-from groq import Groq
+from typing import List, Dict, Any, TYPE_CHECKING
+from functools import cached_property
 import pydantic
-from openai import responses
 import json
-from ..templates.base_client import BaseClient
-from groq.types.chat import ChatCompletion
+from ..templates.base_client import BaseClient, cached_prompt_tokens
+from llm_rpg.utils.http_clients import http2_client, http2_async_client
 import logging
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from groq.types.chat import ChatCompletion
+
 try:
     import instructor
     F_IS_SRUCT = True
@@ -16,16 +18,19 @@ except Exception as e:
     F_IS_SRUCT = False
 
 class GroqW(BaseClient):
+    # cloud API, the rate limits bind before the concurrency does
+    default_concurrency = 50
+
     def __init__(self, model_name,
                  api_key:str,
                  *args, **kwargs):
-        self.model_name = model_name
+        from groq import Groq
+
+        super().__init__(model_name)
         self.__api_key = api_key
-        self.client = Groq(api_key=self.__api_key)
+        self.client = Groq(api_key=self.__api_key, http_client=http2_client())
         # default temperature
-        self._T = 0.5
-        if 'temperature' in kwargs:
-            self._T = kwargs['temperature']
+        self._T = kwargs.get('temperature', 0.5)
 
         if F_IS_SRUCT:
             self.struct_client = instructor.from_groq(self.client)
@@ -33,14 +38,48 @@ class GroqW(BaseClient):
             self.struct_client = None
 
     def set_model(self, model_name):
+        """The model is a request parameter, the client and its connection pool are kept"""
         self.model_name = model_name
-        self.client = Groq(api_key=self.__api_key)
+        return self.client
+
+    def set_api_key(self, api_key: str):
+        """Rebuilds the clients with a new API key"""
+        from groq import Groq
+
+        self.__api_key = api_key
+        self.client = Groq(api_key=self.__api_key, http_client=http2_client())
         if F_IS_SRUCT:
             self.struct_client = instructor.from_groq(self.client)
         else:
             self.struct_client = None
+        # the async client is rebuilt with the new key on next use
+        self.__dict__.pop("aclient", None)
         return self.client
 
+    @cached_property
+    def aclient(self):
+        """Async Groq client, created on the first async call"""
+        from groq import AsyncGroq
+
+        return AsyncGroq(api_key=self.__api_key, http_client=http2_async_client())
+
+    @staticmethod
+    def _prepare_response(raw_response) -> Dict[str, Any]:
+        usage = raw_response.usage
+        stats = {
+            'prompt_tokens': usage.prompt_tokens,
+            'prompt_eval_duration': usage.prompt_time * 1000.0,
+            'eval_tokens': usage.completion_tokens,
+            'eval_duration': usage.completion_time * 1000.0,
+        }
+        cached_tokens = cached_prompt_tokens(usage)
+        if cached_tokens is not None:
+            stats['cached_tokens'] = cached_tokens
+        return {
+            'message': raw_response.choices[0].message.content,
+            "stats": stats
+        }
+
     def chat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> Dict[str, Any]:
         """
         response.choices[0].message.content
@@ -57,40 +96,31 @@ class GroqW(BaseClient):
                 }
             }
         """
-        if 'temperature' in kwargs:
-            temp = kwargs.pop('temperature')
-        else:
-            temp = self._T
+        temp = kwargs.pop('temperature', self._T)
         # exclude possible streaming
-        if "stream" in kwargs:
-            _ = kwargs.pop('stream')
+        kwargs.pop('stream', None)
         raw_response = self.client.chat.completions.create(messages=messages,
                                                    model=self.model_name,
                                                    temperature=temp,
                                                    **kwargs)
+        return self._prepare_response(raw_response)
 
-        response = {
-            'message': raw_response.choices[0].message.content,
-            "stats": {
-                'prompt_tokens': raw_response.usage.prompt_tokens,
-                'prompt_eval_duration': raw_response.usage.prompt_time*1000,
-                'eval_tokens': raw_response.usage.completion_tokens,
-                'eval_duration': raw_response.usage.completion_time*1000,
-                }
-        }
-
-        return response
+    async def achat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> Dict[str, Any]:
+        """Same as chat(), on the async Groq client"""
+        temp = kwargs.pop('temperature', self._T)
+        kwargs.pop('stream', None)
+        raw_response = await self.aclient.chat.completions.create(messages=messages,
+                                                                  model=self.model_name,
+                                                                  temperature=temp,
+                                                                  **kwargs)
+        return self._prepare_response(raw_response)
 
     def struct_output(self, messages: List[Dict[Any, Any]],
                         pydantic_model: pydantic.BaseModel,
                         **kwargs) -> Dict[str, Any]:
-        if 'temperature' in kwargs:
-            temp = kwargs.pop('temperature')
-        else:
-            temp = self._T
+        temp = kwargs.pop('temperature', self._T)
         # exclude possible streaming
-        if "stream" in kwargs:
-            _ = kwargs.pop('stream')
+        kwargs.pop('stream', None)
 
         ans = {
             "message": None,
@@ -98,10 +128,7 @@ class GroqW(BaseClient):
         }
 
         try:
-            system_message = [{
-                "role": "system",
-                "content": f"""You MUST output a JSON object that strictly follows this schema: {json.dumps(pydantic_model.model_json_schema())}"""
-            }]
+            system_message = self.json_object_system(pydantic_model)
         except Exception as e:
             system_message = []
 
@@ -109,17 +136,18 @@ class GroqW(BaseClient):
             response = None
             try:
                 response = self.struct_client.chat.completions.create(model=self.model_name,
-                                                             messages=system_message + messages,
+                                                             messages=self.add_struct_system(messages, system_message),
                                                              response_model=pydantic_model,
                                                              temperature=temp, **kwargs)
             except Exception as e:
                 logger.warning(f"Failed to extract structured output, returning None. Error: {e}")
+                ans['error'] = e
 
             ans['message'] = response
 
         return ans
 
-    def stream(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> ChatCompletion:
+    def stream(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> "ChatCompletion":
         """
         for x in response:
             print(x.choices[0].delta.content)
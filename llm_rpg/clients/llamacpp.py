@@ -1,10 +1,37 @@
-import requests
-from typing import List, Dict, Any
+from functools import cached_property
+from typing import List, Dict, Any, AsyncIterator
 from pydantic import BaseModel
-from openai import OpenAI
-from llm_rpg.templates.base_client import BaseClient
+from llm_rpg.templates.base_client import BaseClient, json_schema_format, cached_prompt_tokens
 import json
 
+try:
+    import orjson
+    F_IS_ORJSON = True
+except ImportError:
+    F_IS_ORJSON = False
+
+# both accept bytes, no decoding of the SSE payload is needed
+_json_loads = orjson.loads if F_IS_ORJSON else json.loads
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Request body as UTF-8 JSON bytes, the sessions already send the JSON content type"""
+    return orjson.dumps(obj) if F_IS_ORJSON else json.dumps(obj).encode("utf-8")
+
+
+def _stats(response) -> Dict[str, Any]:
+    """Stats of an OpenAI SDK response"""
+    stats = {
+        "prompt_tokens": response.usage.prompt_tokens,
+        "prompt_eval_duration": getattr(response, "prompt_eval_duration", None),
+        "eval_tokens": response.usage.completion_tokens,
+        "eval_duration": getattr(response, "eval_duration", None),
+    }
+    cached_tokens = cached_prompt_tokens(response.usage)
+    if cached_tokens is not None:
+        stats["cached_tokens"] = cached_tokens
+    return stats
+
 
 class LocalLLMClient(BaseClient):
     """Wrapper for a local LLM server compatible with the OpenAI API (e.g., llama.cpp server)."""
@@ -24,23 +51,39 @@ class LocalLLMClient(BaseClient):
         :param base_url: The base URL of the local server exposing OpenAI-compatible API.
         :param api_key: Placeholder API key (often not required for local LLMs).
         """
+        # the SDK is imported on first use, as in the other clients
+        from openai import OpenAI
+
         super().__init__(model_name, *args, **kwargs)
+        self.base_url = base_url
+        self.api_key = api_key
         self.client = OpenAI(base_url=base_url, api_key=api_key)
 
+    @cached_property
+    def aclient(self):
+        """Async OpenAI client, created on the first async call"""
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(base_url=self.base_url, api_key=self.api_key)
+
+    @staticmethod
+    def _prepare_response(response) -> Dict[str, Any]:
+        return {
+            "message": response.choices[0].message.content,
+            "stats": _stats(response),
+        }
+
     def chat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> Dict[str, Any]:
         response = self.client.chat.completions.create(model=self.model_name,
                                                        messages=messages,
                                                        **kwargs)
+        return self._prepare_response(response)
 
-        return {
-            "message": response.choices[0].message.content,
-            "stats": {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "prompt_eval_duration": getattr(response, "prompt_eval_duration", None),
-                "eval_tokens": response.usage.completion_tokens,
-                "eval_duration": getattr(response, "eval_duration", None),
-            },
-        }
+    async def achat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> Dict[str, Any]:
+        response = await self.aclient.chat.completions.create(model=self.model_name,
+                                                              messages=messages,
+                                                              **kwargs)
+        return self._prepare_response(response)
 
     def struct_output(self,
                       messages: List[Dict[Any, Any]],
@@ -63,21 +106,17 @@ class LocalLLMClient(BaseClient):
             # Prepend struct system to messages
             final_messages = struct_system + messages
 
+        # the server decodes with the schema's grammar, the output cannot be malformed
+        kwargs.setdefault("response_format", json_schema_format(response_model))
         response = self.client.chat.completions.create(model=self.model_name,
                                                         messages=final_messages,
-                                                        response_format={"type": "json_object"},
                                                         **kwargs)
         raw_content = response.choices[0].message.content
         clean_json = self.extract_json_from_markdown(raw_content)
-        structured = response_model.parse_raw(clean_json)
+        structured = response_model.model_validate_json(clean_json)
         result = {
             "message": structured,
-            "stats": {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "prompt_eval_duration": getattr(response, "prompt_eval_duration", None),
-                "eval_tokens": response.usage.completion_tokens,
-                "eval_duration": getattr(response, "eval_duration", None),
-            },
+            "stats": _stats(response),
         }
         return result
 
@@ -112,48 +151,115 @@ class LocalLLMClientR(BaseClient):
             "Authorization": f"Bearer {self.api_key}",
         }
 
+        # imported here, LocalLLMClient does not need them
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # one session for all the calls, the connection to the server is kept alive
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=50,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        """Closes the pooled connections"""
+        self.session.close()
+
+    def __enter__(self) -> "LocalLLMClientR":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @cached_property
+    def aclient(self):
+        """Pooled httpx async client, kept for the lifetime of the client"""
+        import httpx
+
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=None,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+
+    async def aclose(self) -> None:
+        """Closes the async connection pool, if it was created"""
+        aclient = self.__dict__.pop("aclient", None)
+        if aclient is not None:
+            await aclient.aclose()
+
+    @staticmethod
+    def _prepare_response(response: Dict[str, Any]) -> Dict[str, Any]:
+        usage = response.get("usage", {})
+        stats = {
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "prompt_eval_duration": response.get("prompt_eval_duration"),
+            "eval_tokens": usage.get("completion_tokens"),
+            "eval_duration": response.get("eval_duration"),
+        }
+        # llama-server reports the prompt tokens reused from its KV cache in the timings
+        cached_tokens = cached_prompt_tokens(usage)
+        if cached_tokens is None:
+            cached_tokens = response.get("timings", {}).get("cache_n")
+        if cached_tokens is not None:
+            stats["cached_tokens"] = cached_tokens
+        return {
+            "message": response["choices"][0]["message"]["content"],
+            "stats": stats,
+        }
+
     def chat(self, messages: List[Dict[Any, Any]], **kwargs) -> Dict[str, Any]:
         payload = {"model": self.model_name, "messages": messages, **kwargs}
-        resp = requests.post(
-            f"{self.base_url}/chat/completions", headers=self.headers, json=payload
-        )
+        resp = self.session.post(f"{self.base_url}/chat/completions", data=_json_dumps(payload))
         resp.raise_for_status()
-        response = resp.json()
+        return self._prepare_response(resp.json())
 
-        result = {
-            "message": response["choices"][0]["message"]["content"],
-            "stats": {
-                "prompt_tokens": response.get("usage", {}).get("prompt_tokens"),
-                "prompt_eval_duration": response.get("prompt_eval_duration"),
-                "eval_tokens": response.get("usage", {}).get("completion_tokens"),
-                "eval_duration": response.get("eval_duration"),
-            },
+    async def achat(self, messages: List[Dict[Any, Any]], **kwargs) -> Dict[str, Any]:
+        payload = {"model": self.model_name, "messages": messages, **kwargs}
+        resp = await self.aclient.post("/chat/completions", content=_json_dumps(payload))
+        resp.raise_for_status()
+        return self._prepare_response(resp.json())
+
+    def _struct_payload(
+        self, messages: List[Dict[Any, Any]], response_model: BaseModel, **kwargs
+    ) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "response_format": json_schema_format(response_model),
+            **kwargs,
         }
+
+    def _prepare_struct_response(self, response: Dict[str, Any], response_model: BaseModel) -> Dict[str, Any]:
+        raw_content = response["choices"][0]["message"]["content"]
+        clean_json = self.extract_json_from_markdown(raw_content)
+        result = self._prepare_response(response)
+        result["message"] = response_model.model_validate_json(clean_json)
         return result
 
     def struct_output(
         self, messages: List[Dict[Any, Any]], response_model: BaseModel, **kwargs
     ) -> Any:
-        payload = {"model": self.model_name, "messages": messages, **kwargs}
-        resp = requests.post(
-            f"{self.base_url}/chat/completions", headers=self.headers, json=payload
-        )
+        payload = self._struct_payload(messages, response_model, **kwargs)
+        resp = self.session.post(f"{self.base_url}/chat/completions", data=_json_dumps(payload))
         resp.raise_for_status()
-        response = resp.json()
+        return self._prepare_struct_response(resp.json(), response_model)
 
-        raw_content = response["choices"][0]["message"]["content"]
-        clean_json = self.extract_json_from_markdown(raw_content)
-        structured = response_model.parse_raw(clean_json)
-        result = {
-            "message": structured,
-            "stats": {
-                "prompt_tokens": response.get("usage", {}).get("prompt_tokens"),
-                "prompt_eval_duration": response.get("prompt_eval_duration"),
-                "eval_tokens": response.get("usage", {}).get("completion_tokens"),
-                "eval_duration": response.get("eval_duration"),
-            },
-        }
-        return result
+    async def astruct_output(
+        self, messages: List[Dict[Any, Any]], response_model: BaseModel, **kwargs
+    ) -> Any:
+        """Same as struct_output(), on the pooled async client"""
+        payload = self._struct_payload(messages, response_model, **kwargs)
+        resp = await self.aclient.post("/chat/completions", content=_json_dumps(payload))
+        resp.raise_for_status()
+        return self._prepare_struct_response(resp.json(), response_model)
 
     def stream(self, messages: List[Dict[Any, Any]], **kwargs) -> Any:
         payload = {
@@ -162,21 +268,47 @@ class LocalLLMClientR(BaseClient):
             "stream": True,
             **kwargs,
         }
-        with requests.post(
+        with self.session.post(
             f"{self.base_url}/chat/completions",
-            headers=self.headers,
-            json=payload,
+            data=_json_dumps(payload),
             stream=True,
         ) as resp:
             resp.raise_for_status()
-            for line in resp.iter_lines():
+            for line in self.split_lines(resp.iter_content(chunk_size=None)):
                 if not line:
                     continue
                 if line.startswith(b"data: "):
-                    chunk = line[len(b"data: ") :]
+                    chunk = line[6:]
                     if chunk == b"[DONE]":
                         break
-                    data = json.loads(chunk.decode("utf-8"))
+                    data = _json_loads(chunk)
                     delta = data["choices"][0]["delta"]
                     if "content" in delta and delta["content"]:
                         yield delta["content"]
+
+    async def astream(self, messages: List[Dict[Any, Any]], **kwargs) -> AsyncIterator[str]:
+        """Same as stream(), on the pooled async client"""
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "stream": True,
+            **kwargs,
+        }
+        async with self.aclient.stream("POST", "/chat/completions", content=_json_dumps(payload)) as resp:
+            resp.raise_for_status()
+            buf = bytearray()
+            async for data in resp.aiter_bytes():
+                buf.extend(data)
+                start = 0
+                while (end := buf.find(b"\n", start)) >= 0:
+                    line = bytes(buf[start:end]).rstrip(b"\r")
+                    start = end + 1
+                    if not line.startswith(b"data: "):
+                        continue
+                    chunk = line[6:]
+                    if chunk == b"[DONE]":
+                        return
+                    delta = _json_loads(chunk)["choices"][0]["delta"]
+                    if delta.get("content"):
+                        yield delta["content"]
+                del buf[:start]
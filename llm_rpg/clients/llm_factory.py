@@ -1,21 +1,64 @@
 from typing import Dict, Any, Optional
+import hashlib
+import json
 import os
 import logging
+import threading
 
-from llm_rpg.clients.ollama import OllamaW
-from llm_rpg.clients.deepseek import DeepSeekW_OAI
-from llm_rpg.clients.groq import GroqW
+# the provider clients are imported in their branches: only the SDKs in use get loaded
 from llm_rpg.clients.dummy_llm import DummyLLM
-from llm_rpg.clients.llamacpp import LocalLLMClient
 
 logger = logging.getLogger(__name__)
 
 
+def _config_key(llm_config: Dict[str, Any]) -> str:
+    payload = json.dumps(llm_config, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
 class LLMFactory:
     """Factory class for creating LLM clients based on configuration"""
 
+    # clients by config hash: SDK clients (HTTP pool, TLS context, instructor patching) are built once
+    _CLIENT_CACHE: Dict[str, Any] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def create_llm_client(cls, llm_config: Dict[str, Any]) -> Any:
+        """
+        Returns the LLM client for the configuration, the same instance for the same config.
+        DummyLLM fallbacks (missing key, failed setup) are not cached.
+
+        Args:
+            llm_config: Configuration dictionary for the LLM
+
+        Returns:
+            LLM client instance
+        """
+        key = _config_key(llm_config)
+        with cls._lock:
+            client = cls._CLIENT_CACHE.get(key)
+        if client is not None:
+            return client
+
+        client = cls._create_llm_client(llm_config)
+        is_fallback = isinstance(client, DummyLLM) and llm_config.get('provider', '').lower() != 'dummy'
+        if not is_fallback:
+            with cls._lock:
+                client = cls._CLIENT_CACHE.setdefault(key, client)
+        return client
+
+    @classmethod
+    def invalidate(cls, llm_config: Optional[Dict[str, Any]] = None) -> None:
+        """Drops the cached client of llm_config, or all of them"""
+        with cls._lock:
+            if llm_config is None:
+                cls._CLIENT_CACHE.clear()
+            else:
+                cls._CLIENT_CACHE.pop(_config_key(llm_config), None)
+
     @staticmethod
-    def create_llm_client(llm_config: Dict[str, Any]) -> Any:
+    def _create_llm_client(llm_config: Dict[str, Any]) -> Any:
         """
         Create LLM client based on configuration
 
@@ -30,8 +73,9 @@ class LLMFactory:
         api_key_env = llm_config.get('api_key_env', '')
         props = llm_config.get("props", {})
 
+        api_key = os.environ.get(api_key_env, '')
         # For providers that don't require API key (local LLMs), set default placeholder
-        if not os.environ.get(api_key_env, '') and provider in ['llamacpp', 'ollama']:
+        if not api_key and provider in ['llamacpp', 'ollama']:
             api_key = 'not-needed'
 
         if not api_key and provider not in ['llamacpp', 'ollama', 'dummy']:
@@ -41,19 +85,23 @@ class LLMFactory:
         try:
             if provider == 'deepseek':
                 # Use OpenAI-compatible interface for DeepSeek
+                from llm_rpg.clients.deepseek import DeepSeekW_OAI
                 api_key = os.environ.get(api_key_env, '')
                 return DeepSeekW_OAI(model, api_key, **props)
 
             elif provider == 'groq':
+                from llm_rpg.clients.groq import GroqW
                 api_key = os.environ.get(api_key_env, '')
                 return GroqW(model, api_key, **props)
 
             elif provider == 'llamacpp':
                 # Use OpenAI-compatible interface for llama.cpp server
+                from llm_rpg.clients.llamacpp import LocalLLMClient
                 base_url = llm_config.get('base_url', 'http://localhost:9000/v1')
                 return LocalLLMClient(model, base_url=base_url, api_key=api_key, **props)
 
             elif provider == 'ollama':
+                from llm_rpg.clients.ollama import OllamaW
                 base_url = llm_config.get('base_url', 'http://localhost:11434')
                 return OllamaW(model, host=base_url, **props)
 
@@ -1,8 +1,8 @@
-from typing import List, Dict, Any, Union
-from ollama import ChatResponse, GenerateResponse
+from typing import List, Dict, Any, Iterator, Union
+from functools import cached_property
 from ollama import Client
 import pydantic
-from ..templates.base_client import BaseClient
+from ..templates.base_client import BaseClient, schema_dict
 import logging
 logger = logging.getLogger(__name__)
 import json
@@ -10,11 +10,25 @@ import json
 # Use the base class method instead of this local function
 
 class OllamaW(BaseClient):
+    # more than the server's parallel slots (OLLAMA_NUM_PARALLEL) only queues on the server
+    default_concurrency = 4
+
     def __init__(self, model_name,
                  host:str=None,
+                 schema_prompt: bool = False,
                  **options):
+        """
+        :param model_name: str -- Ollama model
+        :param host: str -- Ollama server, localhost by default
+        :param schema_prompt: bool -- also state the schema in a system prompt for struct_output(),
+            the server already constrains the output with format=, so it is off by default
+        :param options: model options sent with every call
+        """
         self.model_name = model_name
         self.model_options = options
+        self.schema_prompt = schema_prompt
+        # stats of the last finished stream(), the events before the last one have none
+        self.last_stats = None
 
         if host is not None and host!='':
             self.host = host
@@ -25,39 +39,41 @@ class OllamaW(BaseClient):
 
 
     def set_model(self, model_name):
+        """The model is a request parameter, the client and its connection pool are kept"""
         self.model_name = model_name
-        self.client = Client(self.host)
         return self.client
 
+    @cached_property
+    def aclient(self):
+        """Async Ollama client, created on the first async call"""
+        from ollama import AsyncClient
 
-    @staticmethod
-    def __prepare_response(raw_response):
-        response = {}
-        promt_eval_d = -1
-        eval_duration = -1
+        return AsyncClient(host=self.host)
 
-        try:
-            promt_eval_d = raw_response.prompt_eval_duration / 10 ** 6
-        except:
-            promt_eval_d = -1
 
-        try:
-            eval_duration = raw_response.eval_duration / 10 ** 6
-        except:
-            eval_duration = -1
+    def _options(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Call options on top of the model defaults, a fresh dict: the defaults are never modified"""
+        opts = {**self.model_options, **(kwargs.get('options') or {})}
+        temperature = kwargs.get('temperature')
+        if temperature is not None:
+            opts['temperature'] = temperature
+        return opts
 
-        response = {
+    @staticmethod
+    def __prepare_response(raw_response):
+        # the durations are in ns, None when the server did not report them
+        prompt_eval_d = getattr(raw_response, 'prompt_eval_duration', None)
+        eval_d = getattr(raw_response, 'eval_duration', None)
+        return {
             'message': raw_response.message.content,
             'stats': {
                 'prompt_tokens': raw_response.prompt_eval_count,
-                'prompt_eval_duration': promt_eval_d,
+                'prompt_eval_duration': prompt_eval_d * 1e-6 if prompt_eval_d is not None else -1,
                 'eval_tokens': raw_response.eval_count,
-                'eval_duration': eval_duration
+                'eval_duration': eval_d * 1e-6 if eval_d is not None else -1
             }
         }
 
-        return response
-
 
     def chat(self, messages: List[Dict[Any, Any]],
              **kwargs) -> Dict[str, Any]:
@@ -74,14 +90,7 @@ class OllamaW(BaseClient):
                 }
             }
         """
-        options = kwargs.get('options', None)
-        if options is None:
-            opts = self.model_options
-        else:
-            opts = options
-
-        if "temperature" in kwargs:
-            opts.update({"temperature": kwargs['temperature']})
+        opts = self._options(kwargs)
 
         raw_response =  self.client.chat(model=self.model_name,
                            options=opts,
@@ -90,6 +99,17 @@ class OllamaW(BaseClient):
         return response
 
 
+    async def achat(self, messages: List[Dict[Any, Any]],
+                    **kwargs) -> Dict[str, Any]:
+        """Same as chat(), on the async Ollama client"""
+        opts = self._options(kwargs)
+
+        raw_response = await self.aclient.chat(model=self.model_name,
+                                               options=opts,
+                                               messages=messages)
+        return self.__prepare_response(raw_response)
+
+
     def struct_output(self, messages: List[Dict[Any, Any]],
                       pydantic_model: pydantic.BaseModel,
                       **kwargs) -> Dict[str, Any]:
@@ -102,51 +122,69 @@ class OllamaW(BaseClient):
         :return: response --> Dict[str, Any] -- 'message': response
                                                 'stats': Dict[str, int|float]
         """
-        options = kwargs.get('options', None)
-        if options is None:
-            opts = self.model_options
-        else:
-            opts = options
+        raw_response = self.client.chat(**self.__struct_request(messages, pydantic_model, kwargs))
+        return self.__prepare_struct_response(raw_response, pydantic_model)
 
-        if "temperature" in kwargs:
-            opts.update({"temperature": kwargs['temperature']})
 
-        system_message = []
-        try:
-            system_message = self.enforce_struct_output(pydantic_model)
-        except Exception as e:
-            system_message = []
+    async def astruct_output(self, messages: List[Dict[Any, Any]],
+                             pydantic_model: pydantic.BaseModel,
+                             **kwargs) -> Dict[str, Any]:
+        """Same as struct_output(), on the async Ollama client"""
+        raw_response = await self.aclient.chat(**self.__struct_request(messages, pydantic_model, kwargs))
+        return self.__prepare_struct_response(raw_response, pydantic_model)
+
+
+    def __struct_request(self, messages, pydantic_model, kwargs) -> Dict[str, Any]:
+        # format= makes the server generate schema-valid JSON, repeating the schema in
+        # the prompt would only add prompt tokens to every call
+        if self.schema_prompt:
+            messages = self.add_struct_system(messages, self.enforce_struct_output(pydantic_model))
 
-        raw_response = self.client.chat(model=self.model_name,
-                                        options=opts,
-                                        messages=system_message + messages,
-                                        format=pydantic_model.model_json_schema())
+        return {'model': self.model_name,
+                'options': self._options(kwargs),
+                'messages': messages,
+                'format': schema_dict(pydantic_model)}
 
+
+    def __prepare_struct_response(self, raw_response, pydantic_model) -> Dict[str, Any]:
         msg = raw_response.message.content
 
+        error = None
         try:
             clean_json_str = self.extract_json_from_markdown(msg)
             msg_s = pydantic_model.model_validate_json(clean_json_str)
         except Exception as e:
             logger.warning(f"Could not parse the response to the Pydantic model, returning None. Error: {e}")
             msg_s = None
+            error = e
 
         response = self.__prepare_response(raw_response)
         response['message'] = msg_s
+        if error is not None:
+            response['error'] = error
 
         return response
 
 
-    def stream(self, messages: List[Dict[Any, Any]]) -> GenerateResponse:
+    def stream(self, messages: List[Dict[Any, Any]], **kwargs) -> Iterator[str]:
         """
-        stream
-        for x in response:
-            print(x.message.content)
+        Yields the text of the response as it is generated. The stats of the call are
+        only in the last event, they are kept in self.last_stats once the stream is exhausted.
+
+        for text in client.stream(messages):
+            print(text, end="")
+        print(client.last_stats)
 
         :param messages:
-        :return:
+        :return: generator of text pieces
         """
-        return self.client.chat(model=self.model_name,
-                                options=self.model_options,
-                                messages=messages,
-                                stream=True)
+        self.last_stats = None
+        for ev in self.client.chat(model=self.model_name,
+                                   options=self._options(kwargs),
+                                   messages=messages,
+                                   stream=True):
+            text = ev.message.content
+            if text:
+                yield text
+            if ev.done:
+                self.last_stats = self.__prepare_response(ev)['stats']
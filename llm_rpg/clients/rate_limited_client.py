@@ -0,0 +1,85 @@
+"""
+Client wrapper that routes every LLM call through a RateLimiter
+"""
+
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterator, Tuple
+
+import pydantic
+
+from llm_rpg.templates.base_client import BaseClient, LLMResponse
+from llm_rpg.utils.rate_limiter import RateLimiter
+from llm_rpg.utils.tokens import count_tokens, PromptTooLongError
+
+
+def _used_tokens(response: LLMResponse) -> int | None:
+    stats = response.get("stats") or {}
+    if stats.get("prompt_tokens") is None:
+        return None
+    return stats["prompt_tokens"] + (stats.get("eval_tokens") or 0)
+
+
+class RateLimitedClient(BaseClient):
+    def __init__(self, client: BaseClient, limiter: RateLimiter, max_prompt_tokens: int | None = None):
+        """
+        :param client: BaseClient -- the wrapped LLM client
+        :param limiter: RateLimiter -- may be shared by several clients of the same provider
+        :param max_prompt_tokens: int -- longer prompts fail before they are sent, None for no limit
+        """
+        super().__init__(getattr(client, "model_name", None))
+        self.client = client
+        self.default_concurrency = getattr(client, "default_concurrency", self.default_concurrency)
+        self.limiter = limiter
+        self.max_prompt_tokens = max_prompt_tokens
+
+    def _prompt_tokens(self, messages: List[Dict[Any, Any]]) -> int:
+        """Prompt tokens of the call, raises PromptTooLongError if they are over the budget"""
+        tokens = count_tokens(messages, self.model_name)
+        if self.max_prompt_tokens is not None and tokens > self.max_prompt_tokens:
+            raise PromptTooLongError(
+                f"Prompt of {tokens} tokens is over the budget of {self.max_prompt_tokens} tokens"
+            )
+        return tokens
+
+    def set_model(self, model_name: str) -> Any:
+        self.model_name = model_name
+        return self.client.set_model(model_name)
+
+    def chat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> LLMResponse:
+        tokens = self._prompt_tokens(messages)
+        response = self.limiter.call(self.client.chat, messages, *args, tokens=tokens, **kwargs)
+        self.limiter.record(tokens, _used_tokens(response))
+        return response
+
+    def struct_output(self, messages: List[Dict[Any, Any]], response_model: pydantic.BaseModel, **kwargs) -> LLMResponse:
+        tokens = self._prompt_tokens(messages)
+        response = self.limiter.call(self.client.struct_output, messages, response_model, tokens=tokens, **kwargs)
+        self.limiter.record(tokens, _used_tokens(response))
+        return response
+
+    async def achat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> LLMResponse:
+        """Same as chat(), waits for the budget without holding a thread"""
+        tokens = self._prompt_tokens(messages)
+        response = await self.limiter.acall(self.client.achat, messages, *args, tokens=tokens, **kwargs)
+        self.limiter.record(tokens, _used_tokens(response))
+        return response
+
+    async def astruct_output(self, messages: List[Dict[Any, Any]], response_model: pydantic.BaseModel, **kwargs) -> LLMResponse:
+        """Same as struct_output(), waits for the budget without holding a thread"""
+        tokens = self._prompt_tokens(messages)
+        response = await self.limiter.acall(self.client.astruct_output, messages, response_model, tokens=tokens, **kwargs)
+        self.limiter.record(tokens, _used_tokens(response))
+        return response
+
+    def stream(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> Iterator[Any]:
+        """
+        Only opening the stream is limited, the chunks are not. The clients send the
+        request when their stream is first iterated, so the first chunk is pulled
+        within the limiter: a rate limit error on it is retried
+        """
+        def _open() -> Tuple[List[Any], Iterator[Any]]:
+            chunks = iter(self.client.stream(messages, *args, **kwargs))
+            return list(islice(chunks, 1)), chunks
+
+        first, chunks = self.limiter.call(_open, tokens=self._prompt_tokens(messages))
+        return chain(first, chunks)
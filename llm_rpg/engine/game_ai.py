@@ -1,14 +1,17 @@
 from typing import List, Dict, Any, Generator
-from random import shuffle
 from llm_rpg.templates.tool import BaseTool
 from llm_rpg.templates.base_client import BaseClient
 from llm_rpg.engine.memory import GameMemory
-from llm_rpg.engine.npc_ai import NPC
+from llm_rpg.engine.npc_ai import NPC, batch_input_gateway
 from llm_rpg.engine.tools import InputValidator
 from llm_rpg.gui.chat import HookResponse, InputProcessingStatus
 from llm_rpg.prompts.response_models import ValidateClassifyAction
 
-from copy import copy as _cp
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+import asyncio
+import hashlib
 import logging
 import random
 import string
@@ -16,6 +19,31 @@ import string
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True, frozen=True)
+class ToolKwargs:
+    """Call kwargs (the "props" of the LLM config) of each LLM type, fixed for a game"""
+
+    lore_llm: Dict[str, Any] | None = None
+    npc_ai_llm: Dict[str, Any] | None = None
+    game_ai_llm: Dict[str, Any] | None = None
+    input_validator: Dict[str, Any] | None = None
+
+
+async def _task_result(task: asyncio.Task) -> Any:
+    """Result of the task, or the exception it raised"""
+    try:
+        return await task
+    except Exception as e:
+        return e
+
+
+def _inventory_key(inventory: Any) -> tuple:
+    """Order independent, hashable fingerprint of an inventory (item list or item -> count dict)"""
+    if isinstance(inventory, dict):
+        return tuple(sorted(inventory.items()))
+    return tuple(sorted(inventory or ()))
+
+
 class GameAI:
     def __init__(
         self,
@@ -26,41 +54,44 @@ class GameAI:
         **kwargs,
     ):
         self.config = config
-        self.lore = _cp(lore)
+        # read-only view, GameAI never modifies the lore: no copy is needed
+        self.lore = MappingProxyType(lore)
         self.llm_registry = llm_registry
 
         self.__game_response_generated: bool = False
         self.__user_input_validated: bool = False
-        self.__npcs = (
-            list(self.lore["npc"].keys()) if len(self.lore["npc"].keys()) > 0 else None
-        )
+        self.__npcs = tuple(lore["npc"])
+        # the order the NPCs act in, reproducible if config["npc_order_seed"] is set
+        self.__rng = random.Random(self.config.get("npc_order_seed"))
         self.__npc_queue = self.__gen_npc_queue()
         self.__verified_input = ValidateClassifyAction()
 
         self.npc_ai = {}
         self.input_validator = None
+        # LRU of the validation results by (message, context, inventory), repeated
+        # inputs ("look around", "inventory") on an unchanged turn skip the LLM call
+        self._validator_cache: OrderedDict[tuple, ValidateClassifyAction] = OrderedDict()
+        self._validator_cache_size = self.config.get("validator_cache_size", 256)
+        # memory reads of the current turn, the memory changes only once a game action is processed
+        self._turn_cache: Dict[str, Any] = {}
         self.game_ai = None
         self.qa_ai = None
 
         self.memory = memory
 
         self.enforce_json_output = False
-        self.tools_kwargs = {
-            "lore_llm": kwargs.get("lore_llm", None),
-            "npc_ai_llm": kwargs.get("input_validator", None),
-            "game_ai_llm": kwargs.get("game_ai_llm", None),
-            "input_validator": kwargs.get("input_validator", None),
-        }
+        self.tools_kwargs = ToolKwargs(
+            lore_llm=kwargs.get("lore_llm"),
+            npc_ai_llm=kwargs.get("npc_ai_llm"),
+            game_ai_llm=kwargs.get("game_ai_llm"),
+            input_validator=kwargs.get("input_validator"),
+        )
 
         self.__init_npc_ai()
         self.__init_input_validator()
 
-    def __gen_npc_queue(self) -> List[str] | None:
-        if not self.__npcs:
-            return None
-        queue = self.__npcs.copy()
-        shuffle(queue)
-        return queue
+    def __gen_npc_queue(self) -> List[str]:
+        return self.__rng.sample(self.__npcs, len(self.__npcs))
 
     def __init_npc_ai(self):
         if self.llm_registry["npc_ai_llm"] is None:
@@ -68,7 +99,7 @@ class GameAI:
                 f"No LLM found for NPC AI! Will use LLM for main game response"
             )
 
-        for npc in list(self.lore["npc"].keys()):
+        for npc in self.__npcs:
             self.npc_ai[npc] = NPC(
                 self.llm_registry["npc_ai_llm"],
                 self.memory,
@@ -87,29 +118,50 @@ class GameAI:
 
     def verify_user_input(self, message: str) -> ValidateClassifyAction | None:
         if self.input_validator is not None:
-            user_inventory = self.memory.list_inventory_items("human")
-            last_turn_rows = self.memory.get_last_n_rows(
-                self.memory.history_tbl_name, 1
+            user_inventory, context = self._turn_context()
+
+            key = (
+                message.strip().lower(),
+                hashlib.blake2b(context.encode("utf-8"), digest_size=8).digest(),
+                _inventory_key(user_inventory),
             )
-            if last_turn_rows:
-                context = last_turn_rows[0]["ai_response"]
-            else:
-                context = ""
+            cached = self._validator_cache.get(key)
+            if cached is not None:
+                self._validator_cache.move_to_end(key)
+                return cached
+
             additional_context = None
-            return self.input_validator.run(
+            verified = self.input_validator.run(
                 action=message,
                 context=context,
                 inventory=user_inventory,
                 additional_context=additional_context,
                 enforce_json_output=self.enforce_json_output,
-                **self.tools_kwargs["input_validator"],
+                **(self.tools_kwargs.input_validator or {}),
             )
+            if verified is not None and self._validator_cache_size > 0:
+                self._validator_cache[key] = verified
+                if len(self._validator_cache) > self._validator_cache_size:
+                    self._validator_cache.popitem(last=False)
+            return verified
         else:
             logger.debug(
                 f"Input validator is not available, assuming the input was a game action"
             )
             return ValidateClassifyAction()
 
+    def _turn_context(self) -> tuple[Any, str]:
+        """The player's inventory and the last game response, read once per turn"""
+        if "inv_human" not in self._turn_cache:
+            self._turn_cache["inv_human"] = self.memory.list_inventory_items("human")
+            last_turn_rows = self.memory.get_last_n_rows(
+                self.memory.history_tbl_name, 1
+            )
+            self._turn_cache["context"] = (
+                last_turn_rows[0]["ai_response"] if last_turn_rows else ""
+            )
+        return self._turn_cache["inv_human"], self._turn_cache["context"]
+
     def generate_non_game_response(self) -> str:
         return "Non Game Action"
 
@@ -133,51 +185,187 @@ class GameAI:
         Yields:
             HookResponse: One response per NPC, or single response for invalid/non-game actions
         """
-        self.__verified_input = self.verify_user_input(message)
-
-        # Handle invalid input
-        if not self.__verified_input.valid:
-            yield HookResponse(
-                message=self.process_invalid_input(),
-                role="GAME",
-                message_status="failed",
-                input_processing_status=InputProcessingStatus.DONE,
-            )
-            return
-
-        # Handle non-game actions
-        if not self.__verified_input.is_game_action:
-            response = self.generate_non_game_response()
-            yield HookResponse(
-                message=response,
-                role="GAME",
-                message_status="success",
-                input_processing_status=InputProcessingStatus.DONE,
-            )
-            return
+        # the previous input was a game action: a new turn, the memory has changed
+        if self.__user_input_validated:
+            self._turn_cache.clear()
+            self.__user_input_validated = False
 
-        # Initialize for game action processing
-        self.__user_input_validated = True
-        self.__game_response_generated = False
-        self.__npc_queue = self.__gen_npc_queue()
+        npc_queue = self.__gen_npc_queue()
 
-        # Yield NPC responses one at a time
-        while self.__npc_queue:
-            npc = self.__npc_queue.pop(0)
-            npc_response = self.npc_ai[npc].run()
-            is_last_npc = len(self.__npc_queue) == 0
-
-            yield HookResponse(
-                message=npc_response.action,
-                role=npc,
-                message_status="success",
-                input_processing_status=InputProcessingStatus.DONE
-                if is_last_npc
-                else InputProcessingStatus.CONTINUE,
+        # the loop lives for the whole turn: the NPC tasks started with the validation
+        # keep running while the earlier responses are consumed
+        with asyncio.Runner() as runner:
+            self.__verified_input, npc_tasks = runner.run(
+                self._averify_and_start_npcs(message, npc_queue)
             )
 
+            # Handle invalid input
+            if not self.__verified_input.valid:
+                yield HookResponse(
+                    message=self.process_invalid_input(),
+                    role="GAME",
+                    message_status="failed",
+                    input_processing_status=InputProcessingStatus.DONE,
+                )
+                return
+
+            # Handle non-game actions
+            if not self.__verified_input.is_game_action:
+                response = self.generate_non_game_response()
+                yield HookResponse(
+                    message=response,
+                    role="GAME",
+                    message_status="success",
+                    input_processing_status=InputProcessingStatus.DONE,
+                )
+                return
+
+            # Initialize for game action processing
+            self.__user_input_validated = True
+            self.__game_response_generated = False
+            self.__npc_queue = []
+
+            # Each response is yielded in the queue order as soon as it is in, the
+            # next NPCs are still generating. The NPCs that stay silent (None) are skipped
+            acting = [(npc, task) for npc, task in zip(npc_queue, npc_tasks) if task is not None]
+            if not acting:
+                # the gateway left every NPC silent (e.g. "look around"), the turn
+                # still needs its final response
+                yield HookResponse(
+                    message="No one responds",
+                    role="GAME",
+                    message_status="success",
+                    input_processing_status=InputProcessingStatus.DONE,
+                )
+            for idx, (npc, task) in enumerate(acting):
+                npc_response = runner.run(_task_result(task))
+                is_last_npc = idx == len(acting) - 1
+                failed = isinstance(npc_response, Exception)
+                if failed:
+                    logger.error(f"NPC {npc} failed to act: {npc_response}")
+
+                yield HookResponse(
+                    message=f"{npc} does not respond" if failed else npc_response.action,
+                    role=npc,
+                    message_status="failed" if failed else "success",
+                    input_processing_status=InputProcessingStatus.DONE
+                    if is_last_npc
+                    else InputProcessingStatus.CONTINUE,
+                )
+
         self.__game_response_generated = True
 
+    async def _averify_and_start_npcs(
+        self, message: str, npc_queue: List[str]
+    ) -> tuple[ValidateClassifyAction, List[asyncio.Task | None] | None]:
+        """Validate the user input and start the NPCs on it.
+
+        With config["speculative_npc"] the NPCs start together with the validator, so
+        the validation round trip is hidden behind the NPC calls. The NPCs are cancelled
+        if the input turns out to be invalid or not a game action. NPCs whose calls have
+        already started finish in their threads, and their responses are discarded.
+
+        Args:
+            message: User input to process
+            npc_queue: NPCs to run, in the order of their responses
+
+        Returns:
+            The validation result and the NPC tasks (see _astart_npcs()), None if
+            the NPCs should not act
+        """
+        if not self.config.get("speculative_npc", False):
+            verified = await asyncio.to_thread(self.verify_user_input, message)
+            if not (verified.valid and verified.is_game_action):
+                return verified, None
+            return verified, await self._astart_npcs(message, npc_queue)
+
+        npc_start = asyncio.create_task(self._astart_npcs(message, npc_queue))
+        try:
+            verified = await asyncio.to_thread(self.verify_user_input, message)
+        except BaseException:
+            npc_start.cancel()
+            raise
+        if verified.valid and verified.is_game_action:
+            return verified, await npc_start
+
+        npc_start.cancel()
+        try:
+            npc_tasks = await npc_start
+        except asyncio.CancelledError:
+            npc_tasks = []
+        for task in npc_tasks:
+            if task is not None:
+                task.cancel()
+        return verified, None
+
+    async def _astart_npcs(self, message: str, npc_names: List[str]) -> List[asyncio.Task | None]:
+        """Start the NPCs that should act on the user input.
+
+        With config["npc_gateway"] the NPCs first decide whether the input is directed
+        at them, see _agateway_npcs(). Otherwise all of them act.
+
+        Args:
+            message: User input to process
+            npc_names: NPCs to run
+
+        Returns:
+            Tasks in the order of npc_names, None for an NPC that stays silent
+        """
+        if not self.config.get("npc_gateway", False):
+            return self._start_npc_tasks(npc_names)
+
+        acting = await self._agateway_npcs(message, npc_names)
+        tasks = dict(zip(acting, self._start_npc_tasks(acting)))
+        return [tasks.get(npc) for npc in npc_names]
+
+    async def _agateway_npcs(self, message: str, npc_names: List[str]) -> List[str]:
+        """Gateway decisions of the NPCs, config["npc_batch_size"] NPCs per LLM call.
+
+        The NPCs of a batch share the rules and the history context of one prompt.
+        Small batches keep the answers short, the batches run concurrently.
+
+        Args:
+            message: User input to process
+            npc_names: NPCs to decide for
+
+        Returns:
+            NPCs that should act, in the order of npc_names
+        """
+        size = self.config.get("npc_batch_size", 2)
+        batches = [npc_names[i:i + size] for i in range(0, len(npc_names), size)]
+        semaphore = asyncio.Semaphore(self.config.get("max_concurrent_npcs", 4))
+
+        async def _one(batch: List[str]):
+            async with semaphore:
+                return await asyncio.to_thread(
+                    batch_input_gateway, [self.npc_ai[npc] for npc in batch], message
+                )
+
+        decisions = {}
+        for batch_decisions in await asyncio.gather(*[_one(b) for b in batches]):
+            decisions.update(batch_decisions)
+        return [npc for npc in npc_names if decisions[npc]["should_act"]]
+
+    def _start_npc_tasks(self, npc_names: List[str]) -> List[asyncio.Task]:
+        """Start the NPCs concurrently in worker threads, on the running loop.
+
+        At most config["max_concurrent_npcs"] LLM calls are in flight. The turn takes
+        as long as the slowest NPC instead of the sum of all of them.
+
+        Args:
+            npc_names: NPCs to run
+
+        Returns:
+            A task per NPC in the order of npc_names, the result is the NPC response
+        """
+        semaphore = asyncio.Semaphore(self.config.get("max_concurrent_npcs", 4))
+
+        async def _one(npc: str):
+            async with semaphore:
+                return await asyncio.to_thread(self.npc_ai[npc].run)
+
+        return [asyncio.create_task(_one(n)) for n in npc_names]
+
     def get_game_action_stream(self) -> Generator[str, None, None]:
         """Get the game action streaming generator"""
         return self.generate_game_action()
@@ -7,6 +7,10 @@ from llm_rpg.prompts.response_models import GatewayResponse, game_action_types
 from llm_rpg.templates.base_client import BaseClient
 from llm_rpg.templates.tool import BaseTool
 
+# prompt parts derived from the module-level game_action_types, built once at import
+_ACTION_TYPE_NAMES = ", ".join(game_action_types)
+_ACTION_TYPES_EXPLANATION = '-'.join([f"- **{x}**\n" for x in game_action_types.values()])
+
 
 class InputGateway(BaseTool):
     """
@@ -48,13 +52,17 @@ class InputGateway(BaseTool):
         self.known_npc_names = list(self.lore.get("npc", {}).keys())
         self.npc_name_placeholder = "<NPC_name>"
 
+        # depends only on the lore and the config, both fixed for the game
+        self._base_system_prompt = self._build_system_prompt()
+        self.system_prompt = self._base_system_prompt
+
 
-    def _build_system_prompt(self):
+    def _build_system_prompt(self) -> str:
         """Build the system prompt with world rules"""
 
         world_outline = self.lore.get("world_outline", {})
 
-        self.system_prompt = f"""You are an RPG Game Engine that validates and classifies player input.
+        return f"""You are an RPG Game Engine that validates and classifies player input.
 
 YOUR TASK: Analyze player input and determine:
 1. Is it a game action? (player doing something in the world)
@@ -81,13 +89,13 @@ ABOUT the game (lore, surroundings, NPC descriptions, mechanics).
 - Action is possible given the situation and does not contradict the world rules
 False otherwise, with specific violations listed (max {self.config.get('max_violation_words')} words each)
 
-**action_types**: Pick from {", ".join(list(game_action_types.keys()))}:
+**action_types**: Pick from {_ACTION_TYPE_NAMES}:
 - ONLY classify action types for VALID game actions (is_game_action=True AND valid=True)
 - Leave as empty [] if the action is invalid or not a game action
 - No action classification needed for invalid actions - just report the violation 
 
 ACTION TYPES EXPLANATION:
-{'-'.join([ f"- **{x}**\n" for key, x in  game_action_types.items()])}
+{_ACTION_TYPES_EXPLANATION}
 
 OUTPUT RULES:
 - Be strict about validity but permissive about what constitutes a game action
@@ -371,8 +379,7 @@ NPCs present at current location: None
             use_dynamic_context: Whether to extract context from game memory
         """
 
-        self._build_system_prompt()
-        self.system_prompt += self._build_examples_message()
+        self.system_prompt = self._base_system_prompt + self._build_examples_message()
 
         # Build dynamic context
         dynamic_ctx = {}
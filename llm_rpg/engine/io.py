@@ -1,4 +1,4 @@
-# TODO: add handling of empty self.games DataFrame -- this will happen upon the first game start
+# TODO: add handling of empty self.games list -- this will happen upon the first game start
 # Currently all logic relies on presence of certain fields
 """
 Classes to address I/O operations
@@ -10,15 +10,69 @@ Each subfolder is intended to keep
 - anything deemed necessary in future developments
 """
 
-import os, pickle, json
-import pandas as pd
+import atexit, os, json, time
 from datetime import datetime
 from datetime import timezone
+from operator import itemgetter
+from typing import Dict, List, TypedDict, TYPE_CHECKING
 from uuid import uuid4
 
+# pandas is imported by get_all_games() only
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import orjson
+    F_IS_ORJSON = True
+except ImportError:
+    F_IS_ORJSON = False
+
 import logging
 logger = logging.getLogger(__name__)
 
+
+# A row of the games tracker, the tracker stays a plain JSON list of these
+class GameSession(TypedDict):
+    id: str
+    datetime_utc: int  # epoch ms, UTC
+    description: str
+    folder: str
+
+
+def _load_tracker(path: str) -> List[GameSession]:
+    """
+    Reads the games tracker. The trackers written with pandas (column oriented,
+    {"id": {row: id}, "folder": {row: folder}, ...}) are converted to a list of rows.
+    :return: List[GameSession]
+    """
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read()) if F_IS_ORJSON else json.load(f)
+    if isinstance(data, dict):
+        rows = data.get("id", {})
+        data = [{col: values.get(row) for col, values in data.items()} for row in rows]
+    return data
+
+
+def _save_tracker(games: List[GameSession], path: str) -> None:
+    """Writes the tracker in one call to a temp file and moves it in place, a crash never leaves half a file"""
+    if F_IS_ORJSON:
+        payload = orjson.dumps(games, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(games, indent=4).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        # on disk before the rename, a power loss leaves the old or the new tracker
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def game_datetime(game: GameSession) -> datetime:
+    """The creation time of a tracked game, it is kept as epoch milliseconds"""
+    return datetime.fromtimestamp(game["datetime_utc"] / 1000, tz=timezone.utc)
+
+
 class IO:
     """
     Error codes:
@@ -36,20 +90,27 @@ class IO:
         self.id = ""
         # current saving destination (full path)
         self.dst = ""
-        # Known games
-        self.games = pd.DataFrame([])
+        # Known games, in the order they were added
+        self.games: List[GameSession] = []
+        # id -> game of the known games
+        self._id_index: Dict[str, GameSession] = {}
+        # DataFrame built by get_all_games(), None when the games have changed since
+        self._games_df = None
+        # the tracker has changes that are not saved yet, they are saved at exit at the latest
+        self._dirty = False
+        atexit.register(self.save_games)
 
         # reading/setting up games tracker
         # it tracks all game sessions
         # and where the respective game files are saved
         if os.path.exists(os.path.join(self.workdir, "games.json")):
             logger.info(f"Found saved games, reading")
-            self.games = pd.read_json(os.path.join(self.workdir, "games.json"))
-            self.games['datetime_utc'] = pd.to_datetime(self.games['datetime_utc'], unit='ms', utc=True)
+            self.games = _load_tracker(os.path.join(self.workdir, "games.json"))
+            self._id_index = {game['id']: game for game in self.games}
             logger.info(f"Done. Setting current game to the latest")
-            _t = self.games.sort_values(by='datetime_utc', ascending=False)
-            self.id = _t.iloc[0]['id']
-            self.dst = _t.iloc[0]['folder']
+            _latest = max(self.games, key=itemgetter('datetime_utc'))
+            self.id = _latest['id']
+            self.dst = _latest['folder']
             logger.info(f"Setting the current game id to {self.id}")
             logger.info(f"Save destination: {self.dst}")
         else:
@@ -58,12 +119,16 @@ class IO:
 
     def save_games(self) -> int:
         """
-        Saves the games tracker self.games
+        Saves the games tracker self.games if it has unsaved changes. The changes
+        are coalesced: e.g. a description and other edits are written together
         :return: int (error code)
         """
+        if not self._dirty:
+            return 1
         try:
             _fname = os.path.join(self.workdir, "games.json")
-            self.games.to_json(_fname, indent=4)
+            _save_tracker(self.games, _fname)
+            self._dirty = False
             logger.info(f"Saved the game sessions tracker to \"{_fname}\"")
             return 1
         except Exception as e:
@@ -71,54 +136,80 @@ class IO:
             return 2
 
 
-    def __new_game(self) -> pd.DataFrame:
+    def __new_game(self) -> GameSession:
         """
-        Creates a new game DataFrame
-        :return: pd.DataFrame
+        Creates a new game entry
+        :return: GameSession
         """
         _id = uuid4().hex
-        _dst = os.path.join(self.workdir, _id)
-        return pd.DataFrame([{
-                'id': _id,
-                'datetime_utc': datetime.now(tz=timezone.utc),
-                'description': "",
-                'folder': _dst
-            }])
+        return {
+            'id': _id,
+            'datetime_utc': time.time_ns() // 1_000_000,
+            'description': "",
+            'folder': os.path.join(self.workdir, _id)
+        }
 
 
     def add_new_game(self):
         """
         Adds a new game session to the tracker.
         It will also create the corresponding folder
-        and set the self.id and self.folder to the new values
+        and set the self.id and self.folder to the new values.
+        The tracker is saved right away: the lore generation that follows takes
+        minutes, a game that crashes during it can be resumed only if it is listed
         :return:
         """
 
         _new_game = self.__new_game()
+        self.games.append(_new_game)
+        self._games_df = None
+        self._mark_dirty()
+        self._id_index[_new_game['id']] = _new_game
+        _ = self.set_game_id(_new_game['id'])
 
-        if self.games.empty:
-            self.games = _new_game
-        else:
-            self.games = pd.concat([self.games, _new_game], axis=0, ignore_index=True)
+        os.makedirs(self.dst, exist_ok=True)
+        self.save_games()
 
-        _id = _new_game['id'].values.tolist()[0]
-        _dst = _new_game['folder'].values.tolist()[0]
-        _ = self.set_game_id(_id)
 
-        os.makedirs(self.dst, exist_ok=True)
-        _response = self.save_games()
+    def _mark_dirty(self) -> None:
+        """Marks the tracker as changed, unsaved changes are saved at exit at the latest"""
+        self._dirty = True
+
+
+    def get_all_games(self) -> "pd.DataFrame":
+        """
+        The tracker as a DataFrame, for the callers that expect the pandas version of it.
+        It is built once and rebuilt only after the games have changed
+        :return: pd.DataFrame
+        """
+        if self._games_df is None:
+            import pandas as pd
 
+            games = pd.DataFrame(self.games, columns=['id', 'datetime_utc', 'description', 'folder'])
+            games['datetime_utc'] = pd.to_datetime(games['datetime_utc'], unit='ms', utc=True)
+            self._games_df = games
+        return self._games_df
 
-    def get_all_games(self):
-        return self.games
+
+    def set_description(self, id: str, description: str) -> int:
+        """
+        Sets the description of a game, the tracker is not saved
+        :return: int (error code)
+        """
+        if id not in self._id_index:
+            logger.warning(f"\"{id}\" is not found within valid game ids. Skipping")
+            return 1
+        self._id_index[id]['description'] = description
+        self._games_df = None
+        self._mark_dirty()
+        return 0
 
 
     def set_game_id(self, id:str) -> int:
-        ids = self.games['id'].values.tolist()
-        if id in ids:
-            _df_idx = self.games['id'] == id
+        game = self._id_index.get(id)
+        if game is not None:
             self.id = id
-            self.dst = self.games[_df_idx]['folder'].values[0]
+            self.dst = game['folder']
             logger.info(f"Setting the game id to {self.id}")
             logger.info(f"Save destination: {self.dst}")
             return 0
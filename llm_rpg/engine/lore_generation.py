@@ -2,18 +2,20 @@
 Collection of tools to generate a game lore using some basic inputs
 
 There are currently 2 major classes:
-1. GenerateWorld -- generates world and conditions to lose/win
+1. GenerateWorld -- generates the world: outline, description, kingdoms and towns
 2. GenerateCharacter -- generates characters (player/npc)
 
 These classes provide tools to generate the respective lore part. They are governed
  by LoreGeneratorGvt which instantiates both of these and calls with proper arguments.
 """
 
+import asyncio
 import logging
 import time
-from typing import Dict, Any, List
+from itertools import islice
+from typing import Dict, Any, List, Callable
 
-from llm_rpg.utils.prompt_utils import generate_with_retry
+from llm_rpg.utils.prompt_utils import generate_with_retry, agenerate_with_retry
 from llm_rpg.prompts.response_models import WorldDescriptionModel
 
 logger = logging.getLogger(__name__)
@@ -25,6 +27,7 @@ from llm_rpg.prompts.lore_generation import (
     gen_towns_msgs,
     gen_human_char_msgs,
     gen_npc_character_msgs,
+    gen_party_msgs,
     gen_npc_behavior_rules,
     gen_entry_point_msg,
     kingdoms_traits,
@@ -34,12 +37,40 @@ from llm_rpg.prompts.response_models import (
     NPCBehaviorRulesModel,
     CharacterModel,
     NPCCharacterModel,
+    NPCCharactersModel,
+    PartyModel,
 )
 
 from llm_rpg.templates.base_client import BaseClient
 
 import random
-from copy import deepcopy as dCP
+
+
+def _random_key(d: Dict[str, Any]) -> str:
+    """Uniformly random key of a non-empty dict, without building the key list"""
+    return next(islice(d, random.randrange(len(d)), None))
+
+
+def _new_token_totals() -> Dict[str, int]:
+    return {"calls": 0, "prompt_tokens": 0, "eval_tokens": 0, "cached_tokens": 0}
+
+
+def _track_stats(token_totals: Dict[str, int], stats: Dict[str, Any] | None) -> None:
+    """Logs the token usage of an LLM call and adds it to the session totals"""
+    stats = stats or {}
+    prompt_tokens = stats.get("prompt_tokens") or 0
+    cached_tokens = stats.get("cached_tokens") or 0
+    logger.debug("Prompt tokens: %s", prompt_tokens)
+    logger.debug("Eval tokens: %s", stats.get("eval_tokens"))
+    if prompt_tokens:
+        logger.debug(
+            "Cached prompt tokens: %s (%.0f%%)", cached_tokens, 100 * cached_tokens / prompt_tokens
+        )
+
+    token_totals["calls"] += 1
+    token_totals["prompt_tokens"] += prompt_tokens
+    token_totals["eval_tokens"] += stats.get("eval_tokens") or 0
+    token_totals["cached_tokens"] += cached_tokens
 
 
 def _log_generation_summary(game_gen_params: Dict[str, Any], lore: Dict[str, Any]):
@@ -68,6 +99,17 @@ def _log_generation_summary(game_gen_params: Dict[str, Any], lore: Dict[str, Any
             else:
                 successes.append(f"NPC Rules: {npc_name}")
 
+    totals = game_gen_params.get("token_totals")
+    if totals and totals["prompt_tokens"]:
+        logger.info(
+            "Tokens: %s prompt (%s cached, %.0f%%), %s generated in %s calls",
+            totals["prompt_tokens"],
+            totals["cached_tokens"],
+            100 * totals["cached_tokens"] / totals["prompt_tokens"],
+            totals["eval_tokens"],
+            totals["calls"],
+        )
+
     if successes:
         logger.info(f"✓ Successfully generated ({len(successes)} components):")
         for item in successes:
@@ -115,15 +157,21 @@ class LoreGeneratorGvt:
             logger.info("temperature_min not in config, using default 0.5")
             self.temp_min = 0.5
 
+        # token usage of all the calls of this session, shared with the generators
+        self.token_totals = _new_token_totals()
+        self.game_gen_params["token_totals"] = self.token_totals
+
         self.world_generator = GenerateWorld(
             self.client,
             temperature_cooldown_step=self.temp_cooldown_step,
             temperature_min=self.temp_min,
+            token_totals=self.token_totals,
         )
         self.char_gen = GenerateCharacter(
             self.client,
             temperature_cooldown_step=self.temp_cooldown_step,
             temperature_min=self.temp_min,
+            token_totals=self.token_totals,
         )
 
     def _generate_world_outline(
@@ -175,10 +223,18 @@ class LoreGeneratorGvt:
         self.lore.update(self.world_generator.game_lore)
         self.game_gen_params.update(self.world_generator.game_gen_params)
 
+    async def agenerate_towns(self, num_towns, max_workers: int = 4, **client_kw):
+        """Generates towns of all kingdoms concurrently, see GenerateWorld.agen_towns()"""
+        await self.world_generator.agen_towns(
+            num_towns, max_workers=max_workers, **client_kw
+        )
+        self.lore.update(self.world_generator.game_lore)
+        self.game_gen_params.update(self.world_generator.game_gen_params)
+
     def generate_human_player(self, **client_kw):
         # random choice of starting location
-        kingdom_name = random.choice(list(self.lore["kingdoms"].keys()))
-        town_name = random.choice(list(self.lore["towns"][kingdom_name].keys()))
+        kingdom_name = _random_key(self.lore["kingdoms"])
+        town_name = _random_key(self.lore["towns"][kingdom_name])
 
         ans = self.char_gen.gen_characters(
             self.lore,
@@ -189,7 +245,10 @@ class LoreGeneratorGvt:
             **client_kw,
         )
         _key = list(ans.keys())[0]
-        self.lore["human_player"] = ans[_key]
+        self._store_human_player(ans[_key], kingdom_name, town_name)
+
+    def _store_human_player(self, player: Dict[str, Any], kingdom_name: str, town_name: str) -> None:
+        self.lore["human_player"] = player
 
         if "start_location" not in self.lore:
             self.lore["start_location"] = {}
@@ -200,7 +259,49 @@ class LoreGeneratorGvt:
         }
         self.game_gen_params.update(self.char_gen.char_gen_params)
 
+    def generate_party(self, num_npcs: int = 1, batch_size: int = 8,
+                       player_kw: Dict[str, Any] | None = None, **client_kw):
+        """
+        Generates the human player and the NPC companions with one LLM call, the NPCs
+        are written for the player and the player's card is not sent back to the LLM.
+        Falls back to generate_human_player() and generate_npcs_batched() if the call
+        fails or does not produce all the NPCs.
+
+        :param num_npcs: int -- number of NPC companions
+        :param batch_size: int -- max NPCs requested in one prompt by the fallback
+        :param player_kw: Dict[str, Any] -- client kwargs of the fallback player call,
+                                            None to use client_kw
+        """
+        kingdom_name = _random_key(self.lore["kingdoms"])
+        town_name = _random_key(self.lore["towns"][kingdom_name])
+
+        try:
+            player, npcs = self.char_gen.gen_party(
+                self.lore,
+                num_npcs,
+                kingdom_name=kingdom_name,
+                town_name=town_name,
+                **client_kw,
+            )
+        except Exception as e:
+            logger.warning(f"Party generation failed ({e}), generating the player and the NPCs separately")
+            self.generate_human_player(**(client_kw if player_kw is None else player_kw))
+            self.generate_npcs_batched(num_npcs, batch_size=batch_size, **client_kw)
+            return
+
+        self._store_human_player(player, kingdom_name, town_name)
+        self._store_npcs(npcs, kingdom_name, town_name)
+
     def generate_npc(self, num_chars: int = 1, **client_kw):
+        self.generate_npcs_batched(num_chars, **client_kw)
+
+    def generate_npcs_batched(self, num_chars: int = 1, batch_size: int = 8, **client_kw):
+        """
+        Generates NPC companions, up to batch_size of them per LLM call.
+
+        :param num_chars: int -- total number of NPCs
+        :param batch_size: int -- max NPCs requested in one prompt
+        """
         if "start_location" in self.lore and "human" in self.lore["start_location"]:
             kingdom_name = self.lore["start_location"]["human"]["kingdom"]
             town_name = self.lore["start_location"]["human"]["town"]
@@ -208,15 +309,18 @@ class LoreGeneratorGvt:
             logger.error(f"You must generate a human character before!")
             raise KeyError(f"You must generate a human character before!")
 
-        ans = self.char_gen.gen_characters(
+        ans = self.char_gen.gen_npc_characters(
             self.lore,
-            "npc",
             num_chars=num_chars,
+            batch_size=batch_size,
             kingdom_name=kingdom_name,
             town_name=town_name,
             **client_kw,
         )
 
+        self._store_npcs(ans, kingdom_name, town_name)
+
+    def _store_npcs(self, ans: Dict[str, Any], kingdom_name: str, town_name: str) -> None:
         if "start_location" not in self.lore:
             self.lore["start_location"] = {}
 
@@ -227,16 +331,92 @@ class LoreGeneratorGvt:
 
         for _key in list(ans.keys()):
             logger.info(f"Adding {_key}")
-            self.lore["npc"][_key] = dCP(ans[_key])
+            # the card is shared with char_gen.characters: copy the dict and the only
+            # mutable leaf instead of a deep copy
+            npc = ans[_key]
+            self.lore["npc"][_key] = {**npc, "inventory": list(npc.get("inventory", []))}
             self.lore["start_location"]["npc"][_key] = {
                 "kingdom": kingdom_name,
                 "town": town_name,
             }
 
-    def generate_npc_action_rules(
-        self, num_rules_per_category: int = 3, **client_kw
-    ) -> None:
-        """Generate categorized behavioral rules for every NPC with retry and fallback"""
+    def _generate_npc_rules_for(
+        self,
+        npc_name: str,
+        num_rules_per_category: int,
+        max_retries: int,
+        temperature_cooldown_step: float,
+        temperature_min: float,
+        **client_kw,
+    ):
+        """
+        Generates behavioral rules of one NPC.
+
+        :return: (rules, True if the fallback was used)
+        """
+        logger.info(f"Generating behavioral rules for {npc_name}")
+
+        msgs = gen_npc_behavior_rules(
+            self.lore["npc"][npc_name],
+            self.lore,
+            num_rules_per_category=num_rules_per_category,
+        )
+
+        ans = generate_with_retry(
+            client=self.client,
+            messages=msgs,
+            response_model=NPCBehaviorRulesModel,
+            max_retries=max_retries,
+            fallback_value=None,  # No fallback - raise exception on failure
+            component_name=f"NPC Rules: {npc_name}",
+            temperature_cooldown_step=temperature_cooldown_step,
+            temperature_min=temperature_min,
+            **client_kw,
+        )
+        return self._npc_rules_result(npc_name, ans)
+
+    async def _agenerate_npc_rules_for(
+        self,
+        npc_name: str,
+        num_rules_per_category: int,
+        max_retries: int,
+        temperature_cooldown_step: float,
+        temperature_min: float,
+        **client_kw,
+    ):
+        """Same as _generate_npc_rules_for(), on the async client API"""
+        logger.info(f"Generating behavioral rules for {npc_name}")
+
+        msgs = gen_npc_behavior_rules(
+            self.lore["npc"][npc_name],
+            self.lore,
+            num_rules_per_category=num_rules_per_category,
+        )
+
+        ans = await agenerate_with_retry(
+            client=self.client,
+            messages=msgs,
+            response_model=NPCBehaviorRulesModel,
+            max_retries=max_retries,
+            fallback_value=None,  # No fallback - raise exception on failure
+            component_name=f"NPC Rules: {npc_name}",
+            temperature_cooldown_step=temperature_cooldown_step,
+            temperature_min=temperature_min,
+            **client_kw,
+        )
+        return self._npc_rules_result(npc_name, ans)
+
+    def _npc_rules_result(self, npc_name: str, ans: Dict[str, Any]):
+        """:return: (rules, True if the fallback was used)"""
+        _track_stats(self.token_totals, ans["stats"])
+        used_fallback = ans["stats"]["prompt_tokens"] == 0
+        status = "with fallback" if used_fallback else "successfully"
+        logger.info(f"Generated rules for {npc_name} {status}")
+
+        return ans["message"], used_fallback
+
+    def _prepare_npc_rules(self, client_kw: Dict[str, Any]) -> Dict[str, Any]:
+        """Checks the preconditions and extracts the retry config for NPC rules generation"""
         if "npc" not in self.lore:
             logger.error("No NPCs found - generate NPCs first")
             raise KeyError("Must generate NPCs before generating action rules")
@@ -244,41 +424,21 @@ class LoreGeneratorGvt:
         if "npc_rules" not in self.lore:
             self.lore["npc_rules"] = {}
 
-        max_retries = client_kw.pop("max_retries", 3)
+        return {
+            "max_retries": client_kw.pop("max_retries", 3),
+            # Allow per-call override, otherwise use instance variable (from config)
+            "temperature_cooldown_step": client_kw.pop(
+                "temperature_cooldown_step", self.temp_cooldown_step
+            ),
+            "temperature_min": client_kw.pop("temperature_min", self.temp_min),
+        }
 
+    def _store_npc_rules(self, results: Dict[str, Any], max_retries: int) -> None:
         gen_results = {}
-
-        for npc_name in self.lore["npc"]:
-            logger.info(f"Generating behavioral rules for {npc_name}")
-
-            msgs = gen_npc_behavior_rules(
-                self.lore["npc"][npc_name],
-                num_rules_per_category=num_rules_per_category,
-            )
-
-            ans = generate_with_retry(
-                client=self.client,
-                messages=msgs,
-                response_model=NPCBehaviorRulesModel,
-                max_retries=max_retries,
-                fallback_value=None,  # No fallback - raise exception on failure
-                component_name=f"NPC Rules: {npc_name}",
-                # Allow per-call override, otherwise use instance variable (from config)
-                temperature_cooldown_step=client_kw.pop(
-                    "temperature_cooldown_step", self.temp_cooldown_step
-                ),
-                temperature_min=client_kw.pop("temperature_min", self.temp_min),
-                **client_kw,
-            )
-
-            self.lore["npc_rules"][npc_name] = ans["message"]
-
-            used_fallback = ans["stats"]["prompt_tokens"] == 0
+        for npc_name, (rules, used_fallback) in results.items():
+            self.lore["npc_rules"][npc_name] = rules
             gen_results[npc_name] = used_fallback
 
-            status = "with fallback" if used_fallback else "successfully"
-            logger.info(f"Generated rules for {npc_name} {status}")
-
         self.game_gen_params["npc_rules"] = {
             "generated": list(gen_results.keys()),
             "fallback_usage": gen_results,
@@ -287,9 +447,48 @@ class LoreGeneratorGvt:
 
         logger.info("All NPC behavioral rules generation completed")
 
-    def gen_starting_point(self, **client_kw):
+    def generate_npc_action_rules(
+        self, num_rules_per_category: int = 3, **client_kw
+    ) -> None:
+        """Generate categorized behavioral rules for every NPC with retry and fallback"""
+        retry_kw = self._prepare_npc_rules(client_kw)
+
+        results = {
+            npc_name: self._generate_npc_rules_for(
+                npc_name, num_rules_per_category, **retry_kw, **client_kw
+            )
+            for npc_name in self.lore["npc"]
+        }
+        self._store_npc_rules(results, retry_kw["max_retries"])
+
+    async def agenerate_npc_action_rules(
+        self, num_rules_per_category: int = 3, max_workers: int = 4, **client_kw
+    ) -> None:
+        """
+        Same as generate_npc_action_rules(), but the NPCs are processed concurrently
+        with at most max_workers LLM calls in flight, see agen_towns().
+        """
+        retry_kw = self._prepare_npc_rules(client_kw)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def _one(npc_name: str):
+            async with semaphore:
+                return await self._agenerate_npc_rules_for(
+                    npc_name,
+                    num_rules_per_category,
+                    **retry_kw,
+                    **client_kw,
+                )
+
+        npc_names = list(self.lore["npc"])
+        answers = await asyncio.gather(*[_one(n) for n in npc_names])
+        self._store_npc_rules(dict(zip(npc_names, answers)), retry_kw["max_retries"])
+
+    def gen_starting_point(self, on_token: Callable[[str], Any] | None = None, **client_kw):
         """
         Generates the starting point for the game
+        :param on_token: callable -- if given, the text is streamed and each piece is passed
+            to on_token as soon as it arrives
         :param client_kw:
         :return:
         """
@@ -299,7 +498,6 @@ class LoreGeneratorGvt:
 
         k_desc = self.lore["kingdoms"][human_start_k]
         t_desc = self.lore["towns"][human_start_k][human_start_t]
-        world_desc = self.lore["world"]
 
         if "npc" in self.lore:
             npcs_desc = self.lore["npc"]
@@ -309,7 +507,7 @@ class LoreGeneratorGvt:
             npc_start_location = {}
 
         entry_msgs = gen_entry_point_msg(
-            world_desc,
+            self.lore,
             human_player,
             human_start_k,
             k_desc,
@@ -319,9 +517,55 @@ class LoreGeneratorGvt:
             npc_start_location,
         )
 
-        ans = self.client.chat(entry_msgs, **client_kw)
         self.game_gen_params["start"] = entry_msgs
-        self.lore["start"] = ans["message"]
+        if on_token is not None:
+            self.lore["start"] = self._stream_text(entry_msgs, on_token, **client_kw)
+        else:
+            response = self.client.chat(entry_msgs, **client_kw)
+            _track_stats(self.token_totals, response.get("stats"))
+            self.lore["start"] = response["message"]
+
+    def _stream_text(self, messages, on_token: Callable[[str], Any], **client_kw) -> str:
+        """
+        Streams a free text answer into on_token and returns the full text. Falls back to
+        a regular chat call if the client fails to stream before producing any text.
+        """
+        parts = []
+        try:
+            for chunk in self.client.stream(messages, **client_kw):
+                text = BaseClient.chunk_text(chunk)
+                if text:
+                    parts.append(text)
+                    on_token(text)
+        except Exception as e:
+            if parts:
+                raise
+            logger.warning(f"Streaming is not available ({e}), waiting for the full answer")
+            text = self.client.chat(messages, **client_kw)["message"]
+            on_token(text)
+            return text
+        return "".join(parts)
+
+    def restore(self, lore: Dict[str, Any]) -> None:
+        """
+        Restores the state from a partially generated lore (e.g. a checkpoint), so that
+        only the missing parts are generated
+        :param lore: Dict[str, Any] -- lore parts generated before
+        """
+        self.lore.update(lore)
+
+        for key in ("world_outline", "world", "kingdoms", "towns"):
+            if key in lore:
+                self.world_generator.game_lore[key] = lore[key]
+
+        # the names already used must be avoided by the next characters
+        if "human_player" in lore:
+            name = lore["human_player"]["name"]
+            self.char_gen.characters[name] = lore["human_player"]
+            self.char_gen.characters_kinds[name] = "human"
+        for name, npc in lore.get("npc", {}).items():
+            self.char_gen.characters[name] = npc
+            self.char_gen.characters_kinds[name] = "npc"
 
     def log_generation_summary(self):
         """Log summary of what succeeded vs used fallback during generation"""
@@ -334,6 +578,8 @@ class GenerateWorld:
         self.client = client
         self.game_lore = {}
         self.game_gen_params = {}
+        # token usage of the calls, LoreGeneratorGvt passes the dict of the session
+        self.token_totals = kwargs.pop("token_totals", None) or _new_token_totals()
 
         # Temperature cooldown settings for retry logic (from config or defaults)
         if "temperature_cooldown_step" in kwargs:
@@ -385,8 +631,7 @@ class GenerateWorld:
             f"Created structured world outline with categories: "
             f"{list(self.game_lore['world_outline'].keys())}"
         )
-        logger.debug(f"Prompt tokens: {response['stats']['prompt_tokens']}")
-        logger.debug(f"Eval tokens: {response['stats']['eval_tokens']}")
+        _track_stats(self.token_totals, response["stats"])
 
         self.game_gen_params["world_outline"] = {
             "model": self.client.model_name,
@@ -428,8 +673,7 @@ class GenerateWorld:
         self.game_lore["world"] = response["message"]
 
         logger.info(f"Created world: {self.game_lore['world']['name']}")
-        logger.debug(f"Prompt tokens: {response['stats']['prompt_tokens']}")
-        logger.debug(f"Eval tokens: {response['stats']['eval_tokens']}")
+        _track_stats(self.token_totals, response["stats"])
 
         self.game_gen_params["world"] = {
             "model": self.client.model_name,
@@ -457,7 +701,7 @@ class GenerateWorld:
             kt = kingdom_types
 
         # Generate prompt
-        kingdoms_msg = gen_kingdom_msgs(num_kingdoms, kt, self.game_lore["world"])
+        kingdoms_msg = gen_kingdom_msgs(num_kingdoms, kt, self.game_lore)
 
         # Extract retry config
         max_retries = client_kw.pop("max_generation_retries", 3)
@@ -487,8 +731,7 @@ class GenerateWorld:
         }
 
         logger.info(f"Created kingdoms: {list(self.game_lore['kingdoms'].keys())}")
-        logger.debug(f"Prompt tokens: {response['stats']['prompt_tokens']}")
-        logger.debug(f"Eval tokens: {response['stats']['eval_tokens']}")
+        _track_stats(self.token_totals, response["stats"])
 
         self.game_gen_params["kingdoms"] = {
             "model": self.client.model_name,
@@ -498,6 +741,105 @@ class GenerateWorld:
             "max_retries": max_retries,
         }
 
+    def _gen_towns_for_kingdom(
+        self,
+        kingdom: str,
+        num_towns: int,
+        max_retries: int,
+        temperature_cooldown_step: float,
+        temperature_min: float,
+        **client_kw,
+    ):
+        """
+        Generates towns of one kingdom using structured output.
+
+        :return: (towns dict keyed by town name, generation parameters)
+        """
+        from llm_rpg.prompts.response_models import TownsModel
+
+        logger.info(f"Generating {num_towns} towns for {kingdom}")
+
+        # Generate prompt
+        towns_msg = gen_towns_msgs(num_towns, self.game_lore, kingdom)
+
+        # Use structured output with retry (NO FALLBACK - critical component)
+        response = generate_with_retry(
+            self.client,
+            towns_msg,
+            response_model=TownsModel,
+            max_retries=max_retries,
+            fallback_value=None,  # NO FALLBACK - let it fail if generation breaks
+            component_name=f"Towns for {kingdom}",
+            temperature_cooldown_step=temperature_cooldown_step,
+            temperature_min=temperature_min,
+            **client_kw,
+        )
+        return self._towns_result(kingdom, towns_msg, response, max_retries)
+
+    async def _agen_towns_for_kingdom(
+        self,
+        kingdom: str,
+        num_towns: int,
+        max_retries: int,
+        temperature_cooldown_step: float,
+        temperature_min: float,
+        **client_kw,
+    ):
+        """Same as _gen_towns_for_kingdom(), on the async client API"""
+        from llm_rpg.prompts.response_models import TownsModel
+
+        logger.info(f"Generating {num_towns} towns for {kingdom}")
+
+        towns_msg = gen_towns_msgs(num_towns, self.game_lore, kingdom)
+
+        # NO FALLBACK - critical component
+        response = await agenerate_with_retry(
+            self.client,
+            towns_msg,
+            response_model=TownsModel,
+            max_retries=max_retries,
+            fallback_value=None,
+            component_name=f"Towns for {kingdom}",
+            temperature_cooldown_step=temperature_cooldown_step,
+            temperature_min=temperature_min,
+            **client_kw,
+        )
+        return self._towns_result(kingdom, towns_msg, response, max_retries)
+
+    def _towns_result(self, kingdom: str, towns_msg, response: Dict[str, Any], max_retries: int):
+        """
+        Towns of a kingdom from the structured response
+        :return: (towns dict keyed by town name, generation parameters)
+        """
+        # Convert from list to dict for backward compatibility
+        towns_data = response["message"]["towns"]  # List of dicts
+        towns = {
+            t["name"]: t  # Each t is already a plain dict from model_dump()
+            for t in towns_data
+        }
+
+        logger.info(f"Created towns for {kingdom}: {list(towns.keys())}")
+        _track_stats(self.token_totals, response["stats"])
+
+        gen_params = {
+            "model": self.client.model_name,
+            "messages": towns_msg,
+            "structured_model": "TownsModel",
+            "used_fallback": response["stats"]["prompt_tokens"] == 0,
+            "max_retries": max_retries,
+        }
+        return towns, gen_params
+
+    def _pop_towns_retry_kw(self, client_kw: Dict[str, Any]) -> Dict[str, Any]:
+        """Extracts retry config once, so that every kingdom gets the same settings"""
+        return {
+            "max_retries": client_kw.pop("max_generation_retries", 3),
+            "temperature_cooldown_step": client_kw.pop(
+                "temperature_cooldown_step", self.temp_cooldown_step
+            ),
+            "temperature_min": client_kw.pop("temperature_min", self.temp_min),
+        }
+
     def gen_towns(self, num_towns, **client_kw):
         """
         Generates towns for each kingdom using structured output.
@@ -505,62 +847,48 @@ class GenerateWorld:
         This is a critical game component - no fallback provided. If generation
         fails after all retries, the exception will propagate and crash the app.
         """
-        from llm_rpg.prompts.response_models import TownsModel
+        retry_kw = self._pop_towns_retry_kw(client_kw)
 
         self.game_lore["towns"] = {}
         self.game_gen_params["towns"] = {}
 
         for kingdom in self.game_lore["kingdoms"]:
-            logger.info(f"Generating {num_towns} towns for {kingdom}")
-
-            # Generate prompt
-            towns_msg = gen_towns_msgs(
-                num_towns, self.game_lore["world"], self.game_lore["kingdoms"], kingdom
+            towns, gen_params = self._gen_towns_for_kingdom(
+                kingdom, num_towns, **retry_kw, **client_kw
             )
+            self.game_lore["towns"][kingdom] = towns
+            self.game_gen_params["towns"][kingdom] = gen_params
 
-            # Extract retry config
-            max_retries = client_kw.pop("max_generation_retries", 3)
-
-            # Use structured output with retry (NO FALLBACK - critical component)
-            response = generate_with_retry(
-                self.client,
-                towns_msg,
-                response_model=TownsModel,
-                max_retries=max_retries,
-                fallback_value=None,  # NO FALLBACK - let it fail if generation breaks
-                component_name=f"Towns for {kingdom}",
-                temperature_cooldown_step=client_kw.pop(
-                    "temperature_cooldown_step", self.temp_cooldown_step
-                ),
-                temperature_min=client_kw.pop("temperature_min", self.temp_min),
-                **client_kw,
-            )
+    async def agen_towns(self, num_towns, max_workers: int = 4, **client_kw):
+        """
+        Same as gen_towns(), but the kingdoms are generated concurrently, at most
+        max_workers LLM calls are in flight at once. The calls go through the client's
+        astruct_output(): the clients with an async SDK need no thread per call, the
+        others run it in a worker thread.
+        """
+        retry_kw = self._pop_towns_retry_kw(client_kw)
+        semaphore = asyncio.Semaphore(max_workers)
 
-            # Convert from list to dict for backward compatibility
-            towns_data = response["message"]["towns"]  # List of dicts
-            self.game_lore["towns"][kingdom] = {
-                t["name"]: t  # Each t is already a plain dict from model_dump()
-                for t in towns_data
-            }
+        async def _one(kingdom: str):
+            async with semaphore:
+                return await self._agen_towns_for_kingdom(
+                    kingdom,
+                    num_towns,
+                    **retry_kw,
+                    **client_kw,
+                )
 
-            logger.info(
-                f"Created towns for {kingdom}: {list(self.game_lore['towns'][kingdom].keys())}"
-            )
-            logger.debug(f"Prompt tokens: {response['stats']['prompt_tokens']}")
-            logger.debug(f"Eval tokens: {response['stats']['eval_tokens']}")
-
-            self.game_gen_params["towns"][kingdom] = {
-                "model": self.client.model_name,
-                "messages": towns_msg,
-                "structured_model": "TownsModel",
-                "used_fallback": response["stats"]["prompt_tokens"] == 0,
-                "max_retries": max_retries,
-            }
+        kingdoms = list(self.game_lore["kingdoms"])
+        results = await asyncio.gather(*[_one(k) for k in kingdoms])
 
+        self.game_lore["towns"] = {}
+        self.game_gen_params["towns"] = {}
+        for kingdom, (towns, gen_params) in zip(kingdoms, results):
+            self.game_lore["towns"][kingdom] = towns
+            self.game_gen_params["towns"][kingdom] = gen_params
 
-class GenerateCharacter:
-    global CHAR_DESC_STRUCT
 
+class GenerateCharacter:
     def __init__(self, client: BaseClient, **kwargs):
         self.client = client
 
@@ -570,6 +898,8 @@ class GenerateCharacter:
         self.char_gen_params = {}
         # a mapping between names and kinds (human, npc, etc.)
         self.characters_kinds = {}
+        # token usage of the calls, LoreGeneratorGvt passes the dict of the session
+        self.token_totals = kwargs.pop("token_totals", None) or _new_token_totals()
 
         # Temperature cooldown settings for retry logic
         if "temperature_cooldown_step" in kwargs:
@@ -619,6 +949,158 @@ class GenerateCharacter:
 
         return characters
 
+    def gen_npc_characters(
+        self, game_lore: Dict[str, Any], num_chars: int = 1, batch_size: int = 8, **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Creates num_chars NPCs with up to batch_size NPCs per LLM call. The valid NPCs
+        of a batch are kept and only the missing ones are requested again. A batch that
+        fails completely is split in halves, single NPCs are generated one per call.
+
+        :param num_chars: int -- total number of NPCs
+        :param batch_size: int -- max NPCs requested in one prompt
+        :return: Dict with character names as keys and character data as values
+        """
+        characters = {}
+        pending = [
+            min(batch_size, num_chars - i) for i in range(0, num_chars, max(1, batch_size))
+        ]
+
+        while pending:
+            size = pending.pop(0)
+            if size == 1:
+                characters.update(self.gen_characters(game_lore, "npc", **kwargs))
+                continue
+
+            try:
+                batch = self.__gen_npc_batch(game_lore, size, **kwargs)
+            except Exception as e:
+                logger.warning(f"Batch of {size} NPCs failed ({e}), splitting it")
+                pending[:0] = [size // 2, size - size // 2]
+                continue
+
+            logger.info(f"Generated {len(batch)} NPC character(s) in one call")
+            if len(batch) < size:
+                pending.insert(0, size - len(batch))
+            self.characters.update(batch)
+            for key in batch:
+                self.characters_kinds[key] = "npc"
+            characters.update(batch)
+
+        return characters
+
+    def gen_party(
+        self, game_lore: Dict[str, Any], num_npcs: int, **kwargs
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Generates the human player and num_npcs NPC companions with a single structured
+        output call
+
+        :return: (player card, NPC cards keyed by name)
+        """
+        kingdom_name = kwargs.pop("kingdom_name", "")
+        town_name = kwargs.pop("town_name", "")
+        max_retries = kwargs.pop("max_retries", 3)
+
+        names2avoid = list(self.characters.keys())
+        logger.info(f"Generating the player and {num_npcs} npc characters, avoiding names: {names2avoid}")
+
+        party_msgs = gen_party_msgs(
+            game_lore, kingdom_name, town_name, num_npcs, avoid_names=names2avoid
+        )
+        self.char_gen_params["characters"] = party_msgs
+
+        response = generate_with_retry(
+            client=self.client,
+            messages=party_msgs,
+            response_model=PartyModel,
+            max_retries=max_retries,
+            fallback_value=None,
+            component_name=f"Player and {num_npcs} NPC Characters",
+            temperature_cooldown_step=self.temp_cooldown_step,
+            temperature_min=self.temp_min,
+            **kwargs,
+        )
+        _track_stats(self.token_totals, response["stats"])
+
+        player = response["message"]["player"]
+        npcs = {npc["name"]: npc for npc in response["message"]["npcs"]}
+        names = [player["name"], *npcs]
+        if len(npcs) != num_npcs or player["name"] in npcs or set(names) & set(names2avoid):
+            raise ValueError(
+                f"Expected a player and {num_npcs} NPCs with new unique names, got {names}"
+            )
+
+        logger.info(f"Generated the party in one call: {names}")
+        self.characters[player["name"]] = player
+        self.characters_kinds[player["name"]] = "human"
+        for name, npc in npcs.items():
+            self.characters[name] = npc
+            self.characters_kinds[name] = "npc"
+        return player, npcs
+
+    def __gen_npc_batch(
+        self, game_lore: Dict[str, Any], num_chars: int, **kwargs
+    ) -> Dict[str, Any]:
+        """Generates num_chars NPCs with a single structured output call"""
+
+        kingdom_name = kwargs.get("kingdom_name", "")
+        town_name = kwargs.get("town_name", "")
+        max_retries = kwargs.pop("max_retries", 3)
+
+        names2avoid = list(self.characters.keys())
+        logger.info(
+            f"Generating {num_chars} npc characters, avoiding names: {names2avoid}"
+        )
+
+        client_kw = {
+            k: v
+            for k, v in kwargs.items()
+            if k not in ["char_desc_struct", "num_chars", "kingdom_name", "town_name"]
+        }
+
+        char_gen_msgs = gen_npc_character_msgs(
+            game_lore,
+            kingdom_name,
+            town_name,
+            game_lore.get("human_player", {}),
+            avoid_names=names2avoid,
+            num_chars=num_chars,
+        )
+        self.char_gen_params["characters"] = char_gen_msgs
+
+        response = generate_with_retry(
+            client=self.client,
+            messages=char_gen_msgs,
+            response_model=NPCCharactersModel,
+            max_retries=max_retries,
+            fallback_value=None,
+            component_name=f"{num_chars} NPC Characters",
+            temperature_cooldown_step=self.temp_cooldown_step,
+            temperature_min=self.temp_min,
+            **client_kw,
+        )
+
+        _track_stats(self.token_totals, response["stats"])
+        npcs = response["message"]["npcs"]
+        # NPCs with a taken name are dropped, the first of duplicate names is kept
+        characters = {}
+        for npc in npcs:
+            if npc["name"] not in names2avoid and npc["name"] not in characters:
+                characters[npc["name"]] = npc
+            if len(characters) == num_chars:
+                break
+        if not characters:
+            raise ValueError(
+                f"Expected {num_chars} NPCs with new unique names, got {[npc['name'] for npc in npcs]}"
+            )
+        if len(characters) < num_chars:
+            logger.warning(
+                f"Got {len(characters)} of {num_chars} NPCs with new unique names: {list(characters)}"
+            )
+
+        return characters
+
     def __gen_npc(self, game_lore, **kwargs):
         return self.__gen_character_card(game_lore, "npc", **kwargs)
 
@@ -686,6 +1168,7 @@ class GenerateCharacter:
             **client_kw,
         )
 
+        _track_stats(self.token_totals, response["stats"])
         char_data = response["message"]
         character_name = char_data["name"]
 
@@ -13,6 +13,29 @@ import logging
 logger = logging.getLogger(__name__)
 # ----------------------------- Module logging -----------------------------
 
+_MONEY_ITEM = "money"
+
+_INSERT_INVENTORY = text(
+    """INSERT INTO inventory (character, item, count) VALUES (:character, :item, :count)"""
+)
+
+
+def _build_inv(inv_list: List[str], money: int) -> Dict[str, int]:
+    """
+    Initial inventory counts of a character: one of each item plus the money.
+    Duplicated items collapse into one row, (character, item) is the table key.
+
+    Args:
+        inv_list: Items from the character card
+        money: Money from the character card
+
+    Returns:
+        {item: count}
+    """
+    counts = dict.fromkeys(inv_list, 1)
+    counts[_MONEY_ITEM] = money
+    return counts
+
 
 # =============================================================================
 #                        R E F A C T O R E D   G A M E   M E M O R Y
@@ -310,121 +333,98 @@ class GameMemory:
 
     def _populate_initial_data(self, game_lore: Dict[str, Any]) -> None:
         """
-        Orchestrates initial data population.
+        Orchestrates initial data population. All the rows are written in one
+        transaction, so the db file is synced once.
 
         Args:
             game_lore: Game lore dictionary containing initial data
         """
-        self._insert_initial_game_history(game_lore)
-        self._insert_initial_locations(game_lore)
-        self._insert_initial_inventories(game_lore)
+        with self.engine.begin() as conn:
+            self._insert_initial_game_history(conn, game_lore)
+            self._insert_initial_locations(conn, game_lore)
+            self._insert_initial_inventories(conn, game_lore)
         logger.info("Initial data population complete")
 
-    def _insert_initial_game_history(self, game_lore: Dict[str, Any]) -> None:
+    def _insert_initial_game_history(self, conn, game_lore: Dict[str, Any]) -> None:
         """
         Insert initial game_history row (turn 0).
 
         Args:
+            conn: Open connection, committed by the caller
             game_lore: Game lore dictionary containing 'start' key
         """
         start_message = game_lore.get("start", "")
 
-        with self.engine.connect() as conn:
-            conn.execute(
-                text("""INSERT INTO game_history (turn, displayed_action, compacted_history) 
-                       VALUES (0, :displayed_action, '')"""),
-                {"displayed_action": start_message},
-            )
-
-            conn.commit()
+        conn.execute(
+            text("""INSERT INTO game_history (turn, displayed_action, compacted_history) 
+                   VALUES (0, :displayed_action, '')"""),
+            {"displayed_action": start_message},
+        )
 
         logger.info("Inserted initial game_history row")
 
-    def _insert_initial_locations(self, game_lore: Dict[str, Any]) -> None:
+    def _insert_initial_locations(self, conn, game_lore: Dict[str, Any]) -> None:
         """
         Insert initial location data for human player and all NPCs.
 
         Args:
+            conn: Open connection, committed by the caller
             game_lore: Game lore dictionary containing 'start_location' key
         """
         start_location = game_lore.get("start_location", {})
 
-        with self.engine.connect() as conn:
-            # Human player location
-            human_loc = start_location.get("human", {})
-            if human_loc:
-                conn.execute(
-                    text("""INSERT INTO location (turn, character, kingdom, town, details) 
-                           VALUES (0, 'user', :kingdom, :town, '')"""),
-                    {
-                        "kingdom": human_loc.get("kingdom", ""),
-                        "town": human_loc.get("town", ""),
-                    },
-                )
-
-            # NPC locations
-            npc_locations = start_location.get("npc", {})
-            for npc_name, loc_data in npc_locations.items():
-                conn.execute(
-                    text("""INSERT INTO location (turn, character, kingdom, town, details) 
-                           VALUES (0, :character, :kingdom, :town, '')"""),
-                    {
-                        "character": npc_name,
-                        "kingdom": loc_data.get("kingdom", ""),
-                        "town": loc_data.get("town", ""),
-                    },
-                )
-
-            conn.commit()
+        rows = []
+        # Human player location
+        human_loc = start_location.get("human", {})
+        if human_loc:
+            rows.append({
+                "character": "user",
+                "kingdom": human_loc.get("kingdom", ""),
+                "town": human_loc.get("town", ""),
+            })
+
+        # NPC locations
+        npc_locations = start_location.get("npc", {})
+        for npc_name, loc_data in npc_locations.items():
+            rows.append({
+                "character": npc_name,
+                "kingdom": loc_data.get("kingdom", ""),
+                "town": loc_data.get("town", ""),
+            })
+
+        if rows:
+            conn.execute(
+                text("""INSERT INTO location (turn, character, kingdom, town, details) 
+                       VALUES (0, :character, :kingdom, :town, '')"""),
+                rows,
+            )
 
         logger.info("Inserted initial location data")
 
-    def _insert_initial_inventories(self, game_lore: Dict[str, Any]) -> None:
+    def _insert_initial_inventories(self, conn, game_lore: Dict[str, Any]) -> None:
         """
         Insert initial inventory items for human player and all NPCs.
 
         Args:
+            conn: Open connection, committed by the caller
             game_lore: Game lore dictionary containing 'human_player' and 'npc' keys
         """
-        with self.engine.connect() as conn:
-            # Human player inventory
-            human_player = game_lore.get("human_player", {})
-            human_inventory = human_player.get("inventory", [])
-            for item in human_inventory:
-                conn.execute(
-                    text("""INSERT INTO inventory (character, item, count) 
-                           VALUES ('user', :item, 1)"""),
-                    {"item": item},
-                )
+        # Human player inventory and money
+        human_player = game_lore.get("human_player", {})
+        characters = {"user": _build_inv(human_player.get("inventory", []), human_player.get("money", 0))}
 
-            # Human player money
-            human_money = human_player.get("money", 0)
-            conn.execute(
-                text("""INSERT INTO inventory (character, item, count) 
-                       VALUES ('user', 'money', :count)"""),
-                {"count": human_money},
-            )
-
-            # NPC inventories
-            npc_data = game_lore.get("npc", {})
-            for npc_name, npc_info in npc_data.items():
-                npc_inv = npc_info.get("inventory", [])
-                for item in npc_inv:
-                    conn.execute(
-                        text("""INSERT INTO inventory (character, item, count) 
-                               VALUES (:character, :item, 1)"""),
-                        {"character": npc_name, "item": item},
-                    )
-
-                # NPC money
-                npc_money = npc_info.get("money", 0)
-                conn.execute(
-                    text("""INSERT INTO inventory (character, item, count) 
-                           VALUES (:character, 'money', :count)"""),
-                    {"character": npc_name, "count": npc_money},
-                )
+        # NPC inventories and money
+        npc_data = game_lore.get("npc", {})
+        for npc_name, npc_info in npc_data.items():
+            characters[npc_name] = _build_inv(npc_info.get("inventory", []), npc_info.get("money", 0))
 
-            conn.commit()
+        # one executemany for all the characters
+        rows = [
+            {"character": character, "item": item, "count": count}
+            for character, counts in characters.items()
+            for item, count in counts.items()
+        ]
+        conn.execute(_INSERT_INVENTORY, rows)
 
         logger.info("Inserted initial inventory data")
 
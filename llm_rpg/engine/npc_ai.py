@@ -11,8 +11,8 @@ import json
 from copy import copy as _copy
 from typing import List, Dict, Any
 from pydantic import BaseModel
-from llm_rpg.prompts.response_models import NPCResponseModel, NPCGatewayResponse
-from llm_rpg.prompts.npc import gen_npc_base_system_prompt, gen_npc_gateway_prompt
+from llm_rpg.prompts.response_models import NPCResponseModel, NPCGatewayResponse, NPCGatewayBatchResponse
+from llm_rpg.prompts.npc import gen_npc_base_system_prompt, gen_npc_gateway_prompt, gen_npc_batch_gateway_prompt
 from llm_rpg.templates.tool import BaseTool
 from llm_rpg.templates.base_client import BaseClient
 from llm_rpg.engine.memory import GameMemory
@@ -20,12 +20,25 @@ from llm_rpg.utils.prompt_utils import generate_with_retry
 
 
 # ------------------------------ Helpers ------------------------------
+_CARD_SKIP_KEYS = frozenset(("money", "inventory"))
+
+
 def get_other_characters(lore: Dict[str, Any], your_name: str):
     """Extracts names of other NPC characters"""
     npc_names = list(lore["npc"].keys())
     return [x for x in npc_names if x != your_name]
 
 
+def _gateway_user_prompt(user_input: str, history_context: str, task: str) -> str:
+    """Dynamic (per-call) part of the gateway prompt"""
+    return f"""CURRENT INPUT: "{user_input}"
+
+RECENT CONTEXT:
+{history_context}
+
+{task}"""
+
+
 # ------------------------------ NPC AI class ------------------------------
 class NPCAgent(BaseTool):
     def __init__(self,
@@ -38,12 +51,12 @@ class NPCAgent(BaseTool):
         super().__init__(llm_client, NPCResponseModel)
 
         self.my_name = name
-        self.my_card = _copy(lore["npc"][self.my_name])
-        for x in ("money", "inventory"):
-            _ = self.my_card.pop(x)
+        # the card without the items, they live in the memory db
+        self.my_card = {k: v for k, v in lore["npc"][self.my_name].items() if k not in _CARD_SKIP_KEYS}
 
         self.llm_client = llm_client
-        self.lore = _copy(lore)
+        # dict() and not copy(): the lore may come as a read-only MappingProxyType
+        self.lore = dict(lore)
         self.config = config
         self.memory = game_memory
 
@@ -54,13 +67,20 @@ class NPCAgent(BaseTool):
         self.known_locations = [f'Kingdom "{x}" --> Towns: {", ".join(list(lore["towns"][x].keys()))}'\
                                     for x in lore.get("towns", {})]
 
+        # static and character-specific: rendered once, and it is the same prefix on every
+        # call, so the providers with prefix caching (DeepSeek, OpenAI) reuse it
+        self._gateway_system_prompt = gen_npc_gateway_prompt(npc_name=self.my_name,
+                                                             npc_card=self.my_card,
+                                                             other_npc_names=self.other_npc_names)
 
-    def _format_history(self, history: list[dict]) -> str:
+
+    def _format_history(self, history: list[dict], npc_names: List[str] | None = None) -> str:
         """
         Format recent history for dynamic context.
         
         Args:
             history: List of recent game turns from memory
+            npc_names: NPCs whose actions are included, the other NPCs by default
             
         Returns:
             Formatted history string for prompt context
@@ -76,7 +96,7 @@ class NPCAgent(BaseTool):
             
             # Include other NPC actions if present
             npc_actions = []
-            for npc_name in self.other_npc_names:
+            for npc_name in (self.other_npc_names if npc_names is None else npc_names):
                 sanitized = self.memory._inverse_npc_mapping.get(npc_name, npc_name)
                 if sanitized in turn and turn[sanitized]:
                     npc_actions.append(f"{npc_name}: {turn[sanitized]}")
@@ -105,22 +125,13 @@ class NPCAgent(BaseTool):
         # Format history for context
         history_context = self._format_history(recent_history)
         
-     # Build system prompt (static, character-specific)
-        system_prompt = gen_npc_gateway_prompt(npc_name=self.my_name,
-                                                npc_card=self.my_card,
-                                                other_npc_names=self.other_npc_names)
-        
         # Build user prompt (dynamic, per-call)
-        user_prompt = f"""CURRENT INPUT: "{user_input}"
-
-RECENT CONTEXT:
-{history_context}
-
-Apply the checklist above. Is this input directed at you, or not?"""
+        user_prompt = _gateway_user_prompt(user_input, history_context,
+                                           "Apply the checklist above. Is this input directed at you, or not?")
 
         fallback = NPCGatewayResponse(should_act=False, reason="Gateway failed")
         result = generate_with_retry(client=self.llm_client,
-                                     messages=[{"role": "system", "content": system_prompt},
+                                     messages=[{"role": "system", "content": self._gateway_system_prompt},
                                                {"role": "user", "content": user_prompt}],
                                      response_model=NPCGatewayResponse,
                                      max_retries=self.config["max_generation_retries"],
@@ -129,6 +140,9 @@ Apply the checklist above. Is this input directed at you, or not?"""
                                      temperature_cooldown_step=self.config["temperature_cooldown_step"],
                                      temperature_min=self.config["temperature_min"],
                                      temperature=self.config["gateway_temperature"])
+        if result.get("stats"):
+            logger.debug(f"NPC Gateway {self.my_name}: {result['stats'].get('cached_tokens')} "
+                         f"of {result['stats'].get('prompt_tokens')} prompt tokens cached")
         return result["message"]
 
         """
@@ -158,6 +172,55 @@ Apply the checklist above. Is this input directed at you, or not?"""
         return None
 
 
+def batch_input_gateway(agents: List[NPCAgent], user_input: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Gateway decisions of several NPCs in one LLM call, the rules and the history
+    context are sent once for all of them. The call uses the client, the memory and
+    the config of the first agent. If the answer does not hold exactly one decision
+    per NPC, each NPC decides in its own call.
+
+    Args:
+        agents: NPC agents to decide for
+        user_input: Current user input
+
+    Returns:
+        Dict of NPC name -> {'should_act': bool, 'reason': str}
+    """
+    if len(agents) == 1:
+        return {agents[0].my_name: agents[0]._input_gateway(user_input)}
+
+    lead = agents[0]
+    names = [agent.my_name for agent in agents]
+    recent_history = lead.memory.get_last_n_turns(n=lead.config.get("gateway_history_depth"))
+    history_context = lead._format_history(recent_history, npc_names=lead.other_npc_names + [lead.my_name])
+
+    system_prompt = gen_npc_batch_gateway_prompt(npc_cards={agent.my_name: agent.my_card for agent in agents},
+                                                 other_npc_names=[x for x in lead.other_npc_names if x not in names])
+    user_prompt = _gateway_user_prompt(user_input, history_context,
+                                       f"Apply the checklist above to each of: {', '.join(names)}.")
+
+    decisions = {}
+    try:
+        result = generate_with_retry(client=lead.llm_client,
+                                     messages=[{"role": "system", "content": system_prompt},
+                                               {"role": "user", "content": user_prompt}],
+                                     response_model=NPCGatewayBatchResponse,
+                                     max_retries=lead.config["max_generation_retries"],
+                                     component_name=f"NPC Gateway: {', '.join(names)}",
+                                     temperature_cooldown_step=lead.config["temperature_cooldown_step"],
+                                     temperature_min=lead.config["temperature_min"],
+                                     temperature=lead.config["gateway_temperature"])
+        decisions = {x["npc_name"]: {"should_act": x["should_act"], "reason": x["reason"]}
+                     for x in result["message"]["decisions"]}
+    except Exception as e:
+        logger.warning(f"Batched gateway for {names} failed: {e}")
+
+    if decisions.keys() != set(names):
+        logger.warning(f"Batched gateway did not decide for exactly {names}, one call per NPC instead")
+        return {agent.my_name: agent._input_gateway(user_input) for agent in agents}
+    return decisions
+
+
 # ------------------------------ DEPRECATED: NPC AI class ------------------------------
 class NPC_old(BaseTool):
     def __init__(
@@ -1,24 +1,42 @@
-from typing import Dict
-
-from rich.console import Console
-from rich.panel import Panel
-from rich.style import Style
-from rich.text import Text
-from rich.table import Table
+from typing import Dict, TYPE_CHECKING
+from functools import cached_property, lru_cache
 import os
 
-from llm_rpg.gui.styles import ConsoleStyles
 from llm_rpg.utils.gui import format_dict_with_categories
 
+# rich is imported on first use only, runs that never print do not pay for it
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.style import Style
+    from llm_rpg.gui.styles import ConsoleStyles
+
+_CLEAR_CMD = "cls" if os.name == "nt" else "clear"
+
+
+def _shell_clear() -> None:
+    os.system(_CLEAR_CMD)
+
+
+@lru_cache(maxsize=32)
+def _header_panel(title: str, title_style: "Style", border_style: "Style"):
+    """Header panels are rebuilt only for new titles, menus repaint the same ones"""
+    from rich.panel import Panel
+    from rich.text import Text
+
+    return Panel.fit(
+        Text(title, justify="center", style=title_style),
+        border_style=border_style,
+    )
+
 
 class ConsoleManager:
     """Handles console creation and management with rich library"""
 
     def __init__(self):
-        """Initialize console manager with environment setup and console creation"""
+        """Initialize console manager with environment setup, the console is created on first access"""
         self.setup_terminal_environment()
-        self._styles = ConsoleStyles()  # Using the new styles class
-        self._console = self.create_console()
+        # rebound on the first clear_screen() call to the method that works
+        self._clear = self._first_clear
 
     def setup_terminal_environment(self) -> None:
         """Ensure basic terminal environment variables"""
@@ -27,8 +45,20 @@ class ConsoleManager:
         if "COLORTERM" not in os.environ:
             os.environ["COLORTERM"] = "truecolor"
 
-    def create_console(self) -> Console:
+    @cached_property
+    def _styles(self) -> "ConsoleStyles":
+        from llm_rpg.gui.styles import ConsoleStyles
+
+        return ConsoleStyles()
+
+    @cached_property
+    def _console(self) -> "Console":
+        return self.create_console()
+
+    def create_console(self) -> "Console":
         """Create console with fallback options"""
+        from rich.console import Console
+
         try:
             return Console(theme=self._styles.theme)
         except Exception:
@@ -36,28 +66,31 @@ class ConsoleManager:
 
     def clear_screen(self) -> None:
         """Clear the terminal screen"""
+        self._clear()
+
+    def _first_clear(self) -> None:
+        """Clears the screen and picks the clear method for the next calls"""
         try:
             self.console.clear()  # Preferred method using rich
+            self._clear = self.console.clear
         except Exception:
             # Alternative cross-platform solution:
-            os.system("cls" if os.name == "nt" else "clear")
+            _shell_clear()
+            self._clear = _shell_clear
 
     def display_header(self, title: str) -> None:
         """Display a styled header with the given title"""
         self.console.print(
-            Panel.fit(
-                Text(title, justify="center", style=self._styles.get_style("title")),
-                border_style=self.get_style("menu"),
-            ),
+            _header_panel(title, self.get_style("title"), self.get_style("menu")),
             justify="center",
         )
 
-    def get_style(self, style_name: str) -> Style:
+    def get_style(self, style_name: str) -> "Style":
         """Convenience method to get a style by name"""
         return self._styles.get_style(style_name)
 
     @property
-    def console(self) -> Console:
+    def console(self) -> "Console":
         """The rich Console instance"""
         return self._console
 
@@ -65,6 +98,9 @@ class ConsoleManager:
         self, title: str, content: str, style_name: str = "rpg_npc"
     ) -> None:
         """Display a lore section in a styled panel"""
+        from rich.panel import Panel
+        from rich.text import Text
+
         panel = Panel(
             Text(content, style=self.get_style("llm_output")),
             title=title,
@@ -77,6 +113,9 @@ class ConsoleManager:
         self, title: str, character_data: Dict[str, str], style_name: str = "rpg_npc"
     ) -> None:
         """Display a character card with fixed-width field labels and bold text in a panel"""
+        from rich.panel import Panel
+        from rich.table import Table
+        from rich.text import Text
 
         # Capitalize field names for display
         def format_label(key: str) -> str:
@@ -166,6 +205,6 @@ class ConsoleManager:
             )
 
     @property
-    def styles(self) -> Dict[str, Style]:
+    def styles(self) -> Dict[str, "Style"]:
         """Dictionary of predefined styles"""
         return self._styles
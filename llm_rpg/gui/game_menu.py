@@ -7,6 +7,7 @@ import time
 from typing import Dict, Any, Optional
 from llm_rpg.templates.game_menu import Menu
 from llm_rpg.gui.console_manager import ConsoleManager
+from llm_rpg.engine.io import game_datetime
 
 # -------------------------- Set of global parameters --------------------------
 G_INV_INPUT_SLEEP_S = 1
@@ -195,9 +196,9 @@ class LoadGameMenu(Menu):
             self.clear_screen()
             self.display_header("💾 Load Saved Game 💾")
 
-            games = self.io.get_all_games()
+            games = self.io.games
 
-            if games.empty:
+            if not games:
                 self.console.print(
                     Text("No saved games found!", style=self.console_manager.get_style('error')),
                     justify="center"
@@ -210,9 +211,10 @@ class LoadGameMenu(Menu):
             table.add_column("Description", style=self.console_manager.get_style('option'))
             table.add_column("Date", style=self.console_manager.get_style('info'))
 
-            for idx, row in games[["description", "datetime_utc"]].iterrows():
-                date_str = row["datetime_utc"].strftime("%Y-%m-%d %H:%M")
-                table.add_row(str(idx + 1), row["description"], date_str)
+            # the menu numbers the games by position
+            for idx, game in enumerate(games):
+                date_str = game_datetime(game).strftime("%Y-%m-%d %H:%M")
+                table.add_row(str(idx + 1), game["description"], date_str)
 
             self.console.print(table, justify="center")
 
@@ -64,6 +64,38 @@ Instructions:
 
 
 ########################################################################################################################
+def gen_lore_prefix_msgs(game_lore: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Returns the system message shared by all lore calls made once the world exists.
+
+    It only depends on the world description and the world rules (in sorted order), so it
+    is byte-identical across these calls and providers can reuse their prompt-prefix cache.
+    Stage specific context must go after it.
+
+    :param game_lore: lore with "world" and (optionally) "world_outline"
+    :return: System message list
+    """
+    world = game_lore["world"]
+    world_rules = game_lore.get("world_outline") or {}
+
+    rules = []
+    for category in sorted(world_rules):
+        rules.append(f"{category}:")
+        for rule in world_rules[category]:
+            rules.append(f"- {rule}")
+
+    content = f"""{LORE_GEN_SYS_PRT}
+
+WORLD CONTEXT:
+World Name: {world["name"]}
+World Description: {world["description"]}
+
+WORLD RULES:
+{chr(10).join(rules) if rules else "none"}"""
+
+    return [{"role": "system", "content": content}]
+
+
 def gen_world_rules_msgs(
     num_rules: int, world_type: str = "fantasy", kind: str = "dark"
 ) -> List[Dict[str, str]]:
@@ -174,17 +206,17 @@ Return ONLY the JSON object, no markdown or additional text."""
 
 
 def gen_kingdom_msgs(
-    num_kingdoms: int, kingdoms_traits: str, world: Dict[str, str]
+    num_kingdoms: int, kingdoms_traits: str, game_lore: Dict[str, Any]
 ) -> List[Dict[str, str]]:
     """
-    Returns user prompt for structured kingdom generation.
+    Returns messages for structured kingdom generation.
 
     System prompt with Pydantic schema is added automatically by struct_output().
 
     :param num_kingdoms: Number of kingdoms to generate
     :param kingdoms_traits: Description of kingdom type options
-    :param world: World description dict with 'name' and 'description' keys
-    :return: User message for structured output (system added by struct_output)
+    :param game_lore: lore with the world description and rules
+    :return: Shared lore prefix + user message (schema added by struct_output)
     """
     if num_kingdoms < 1:
         logger.warning(f'Expected "num_kingdoms">=1, got {num_kingdoms}. Set to 1!')
@@ -192,10 +224,6 @@ def gen_kingdom_msgs(
 
     user_prompt = f"""Create {num_kingdoms} unique kingdoms for this fantasy world.
 
-WORLD CONTEXT:
-World Name: {world["name"]}
-World Description: {world["description"]}
-
 KINGDOM TYPE OPTIONS:
 {kingdoms_traits}
 
@@ -217,46 +245,40 @@ For each kingdom provide:
 
 Output as JSON array of kingdom objects matching the KingdomsModel schema."""
 
-    return [{"role": "user", "content": user_prompt}]
+    return gen_lore_prefix_msgs(game_lore) + [{"role": "user", "content": user_prompt}]
 
 
 def gen_towns_msgs(
     num_towns: int,
-    world: Dict[str, str],
-    kingdoms: Dict[str, Dict[str, str]],
+    game_lore: Dict[str, Any],
     kingdom_name: str,
 ) -> List[Dict[str, Any]]:
     """
-    Returns user prompt for structured town generation.
+    Returns messages for structured town generation.
 
     System prompt with Pydantic schema is added automatically by struct_output().
 
     :param num_towns: Number of towns to generate
-    :param world: World description dict with 'name' and 'description' keys
-    :param kingdoms: Dict of all kingdoms
+    :param game_lore: lore with the world description, rules and all kingdoms
     :param kingdom_name: Name of the kingdom for which to generate towns
-    :return: User message for structured output (system added by struct_output)
+    :return: Shared lore prefix + user message (schema added by struct_output)
     """
     if num_towns < 1:
         logger.warning(f'Expected "num_towns">=1, got {num_towns}. Set to 1!')
         num_towns = 1
 
+    kingdoms = game_lore["kingdoms"]
     lst_kings = [x for x in kingdoms if x != kingdom_name]
 
-    user_prompt = f"""Create {num_towns} unique, memorable towns for this fantasy kingdom.
-
-WORLD CONTEXT:
-World Name: {world["name"]}
-World Description: {world["description"]}
-
-KINGDOM CONTEXT:
-{dict_2_str(kingdoms[kingdom_name])}
+    # the instructions are the same for all kingdoms, the kingdom specific part goes last
+    # so the calls of a lore session share the longest possible prompt prefix
+    user_prompt = f"""Create {num_towns} unique, memorable towns for the fantasy kingdom described below.
 
 YOUR TASK:
 Create exactly {num_towns} distinctive towns that feel authentic to this kingdom's character. Each town should have its own identity while fitting the kingdom's overall theme.
 
 TOWN NAMING RULES:
-- Town names MUST NOT match any kingdom names: {", ".join(lst_kings) if lst_kings else "none"}
+- Town names MUST NOT match any of the kingdom names listed at the end
 - Use evocative, fantasy-appropriate names (e.g., "Whisperwood", "Ironcross", "Silverhaven")
 - Avoid generic names like "Small Village" or "Big City"
 
@@ -279,9 +301,14 @@ FOR EACH TOWN PROVIDE:
 - **location**: Geographical position in kingdom (~10 words)  
 - **important_places**: Key landmarks reflecting town's character (~10 words)
 
-Output as JSON array matching the TownsModel schema."""
+Output as JSON array matching the TownsModel schema.
 
-    return [{"role": "user", "content": user_prompt}]
+KINGDOM CONTEXT:
+{dict_2_str(kingdoms[kingdom_name])}
+
+Kingdom names the towns must not use: {", ".join(lst_kings) if lst_kings else "none"}"""
+
+    return gen_lore_prefix_msgs(game_lore) + [{"role": "user", "content": user_prompt}]
 
 
 def gen_human_char_msgs(
@@ -308,19 +335,14 @@ def gen_human_char_msgs(
 
     world_type = game_lore.get("world", {}).get("type", "fantasy")
 
+    # static instructions first, the per-call settings and the banned names last
     user_prompt = f"""Create ONE original character based on the world, kingdom and town settings.
 
-World Name: {game_lore["world"]["name"]}
-World Description: {game_lore["world"]["description"]}
-
-The kingdom: {dict_2_str(game_lore["kingdoms"][kingdom_name])}
-The town: {dict_2_str(game_lore["towns"][kingdom_name][town_name])}
-
 Character should include:
-- A unique name (1-3 words) NOT in this banned list: {", ".join(avoid_names) if avoid_names else "none"}
+- A unique name (1-3 words) NOT in the banned list below
 - Gender: male or female only
 - Occupation appropriate for a {world_type} world
-- Age between {age_min} and {age_max} years
+- Age within the age range below
 - 1-2 sentence backstory
 - Emotional wounds (up to 10 words)
 - Deepest motivations (up to 10 words)
@@ -330,15 +352,19 @@ Character should include:
 - Communication style (5 words max)
 - Notable strengths (up to 10 words)
 - Notable weaknesses (up to 10 words)
-- Starting gold between {money_min} and {money_max} coins
+- Starting gold within the gold range below
 - Logical starting inventory (functional item names, 1-2 words each, max 10 items)
 
-The character's occupation should match the world setting. Inventory items must be logical for their profession and goals."""
+The character's occupation should match the world setting. Inventory items must be logical for their profession and goals.
+
+The kingdom: {dict_2_str(game_lore["kingdoms"][kingdom_name])}
+The town: {dict_2_str(game_lore["towns"][kingdom_name][town_name])}
+
+Age range: {age_min} to {age_max} years
+Gold range: {money_min} to {money_max} coins
+Banned names: {", ".join(avoid_names) if avoid_names else "none"}"""
 
-    return [
-        {"role": "system", "content": LORE_GEN_SYS_PRT},
-        {"role": "user", "content": user_prompt},
-    ]
+    return gen_lore_prefix_msgs(game_lore) + [{"role": "user", "content": user_prompt}]
 
 
 def gen_npc_character_msgs(
@@ -347,34 +373,42 @@ def gen_npc_character_msgs(
     town_name: str,
     human_player: Dict[str, Any],
     avoid_names: List[str] = [],
+    num_chars: int = 1,
 ) -> List[Dict[str, Any]]:
-    """Generates messages to create ONE NPC companion character"""
+    """
+    Generates messages to create NPC companion character(s)
+
+    :param num_chars: int -- number of NPCs to create in one call. For num_chars > 1
+        the answer is expected to match NPCCharactersModel, NPCCharacterModel otherwise
+    """
 
     age_min = random.randint(18, 30)
     age_max = random.randint(age_min + 10, age_min + 40)
     money_min = random.randint(100, 400)
     money_max = random.randint(money_min + 200, 1000)
 
-    user_prompt = f"""Create ONE NPC companion character who will join the human player on their adventure.
+    if num_chars > 1:
+        task = f"Create {num_chars} distinct NPC companion characters who will join the human player on their adventure."
+        output_note = f"""
 
-WORLD CONTEXT:
-World Name: {game_lore["world"]["name"]}
-World Description: {game_lore["world"]["description"]}
+Every NPC must have a different name, occupation and personality.
+Output a JSON object with an `npcs` list of exactly {num_chars} NPCs, matching the NPCCharactersModel schema."""
+    else:
+        task = "Create ONE NPC companion character who will join the human player on their adventure."
+        output_note = ""
 
-The kingdom: {dict_2_str(game_lore["kingdoms"][kingdom_name])}
-The town: {dict_2_str(game_lore["towns"][kingdom_name][town_name])}
-
-HUMAN PLAYER (the NPC will companion):
-{dict_2_str(human_player)}
+    # static instructions first: the NPC calls of a lore session differ only in the
+    # trailing part (town, player, random bounds, names already taken)
+    user_prompt = f"""{task}
 
 NPC INSTRUCTIONS:
-Create an interesting NPC companion who lives in this town and will join the human player's journey. Focus on creating a character with depth who has genuine reasons to become a companion.
+Create an interesting NPC companion who lives in the town below and will join the human player's journey. Focus on creating a character with depth who has genuine reasons to become a companion.
 
 The NPC should include:
-- A unique name (1-3 words) NOT in this banned list: {", ".join(avoid_names) if avoid_names else "none"}
+- A unique name (1-3 words) NOT in the banned list below
 - Gender: male or female only
 - Occupation: appropriate for the world setting
-- Age between {age_min} and {age_max} years
+- Age within the age range below
 - Biography/history: 1-2 sentences about their background
 - Emotional wounds (up to 10 words)
 - Deepest desires/motivations (up to 10 words)
@@ -384,34 +418,101 @@ The NPC should include:
 - Communication style (5 words max)
 - Notable strengths (up to 10 words)
 - Notable weaknesses (up to 10 words)
-- Starting gold between {money_min} and {money_max} coins
+- Starting gold within the gold range below
 - Logical starting inventory (functional item names, 1-2 words each, max 10 items)
 
-IMPORTANT: The NPC does NOT have their own epic goal. They are a companion who supports the human player. Focus on their biography and motivation to join as a faithful companion."""
+IMPORTANT: The NPC does NOT have their own epic goal. They are a companion who supports the human player. Focus on their biography and motivation to join as a faithful companion.{output_note}
 
-    return [
-        {"role": "system", "content": LORE_GEN_SYS_PRT},
-        {"role": "user", "content": user_prompt},
-    ]
+The kingdom: {dict_2_str(game_lore["kingdoms"][kingdom_name])}
+The town: {dict_2_str(game_lore["towns"][kingdom_name][town_name])}
+
+HUMAN PLAYER (the NPC will companion):
+{dict_2_str(human_player)}
+
+Age range: {age_min} to {age_max} years
+Gold range: {money_min} to {money_max} coins
+Banned names: {", ".join(avoid_names) if avoid_names else "none"}"""
+
+    return gen_lore_prefix_msgs(game_lore) + [{"role": "user", "content": user_prompt}]
+
+
+def gen_party_msgs(
+    game_lore: Dict[str, Any],
+    kingdom_name: str,
+    town_name: str,
+    num_npcs: int,
+    avoid_names: List[str] = [],
+) -> List[Dict[str, Any]]:
+    """
+    Generates messages to create the human player and the NPC companions in one call,
+    the answer is expected to match PartyModel
+
+    :param num_npcs: int -- number of NPC companions
+    """
+    age_min = random.randint(18, 30)
+    age_max = random.randint(age_min + 10, age_min + 40)
+    money_min = random.randint(100, 400)
+    money_max = random.randint(money_min + 200, 1000)
+
+    world_type = game_lore.get("world", {}).get("type", "fantasy")
+
+    # static instructions first, the per-call settings and the banned names last
+    user_prompt = f"""Create the party of the game: ONE human player character and {num_npcs} NPC companion(s) who will join the player on their adventure. All of them start in the town below.
+
+Every character should include:
+- A unique name (1-3 words) NOT in the banned list below, all names must differ
+- Gender: male or female only
+- Occupation appropriate for a {world_type} world
+- Age within the age range below
+- Physical attributes (strength, dexterity, endurance)
+- Mental attributes (intelligence, wisdom)
+- Communication style (5 words max)
+- Notable strengths (up to 10 words)
+- Notable weaknesses (up to 10 words)
+- Starting gold within the gold range below
+- Logical starting inventory (functional item names, 1-2 words each, max 10 items)
+
+The human player additionally has:
+- 1-2 sentence backstory
+- Emotional wounds and deepest motivations (up to 10 words each)
+- An epic goal that drives the story forward
+
+Each NPC additionally has:
+- Biography/history: 1-2 sentences about their background
+- Emotional wounds and deepest desires (up to 10 words each)
+- Motivation to join: why this NPC wants to support this player as a companion
+
+IMPORTANT: The NPCs do NOT have their own epic goal. They are companions who support the human player: write them for this player, with different occupations and personalities.
+
+Output the player and exactly {num_npcs} NPCs as JSON matching the PartyModel schema.
+
+The kingdom: {dict_2_str(game_lore["kingdoms"][kingdom_name])}
+The town: {dict_2_str(game_lore["towns"][kingdom_name][town_name])}
+
+Age range: {age_min} to {age_max} years
+Gold range: {money_min} to {money_max} coins
+Banned names: {", ".join(avoid_names) if avoid_names else "none"}"""
+
+    return gen_lore_prefix_msgs(game_lore) + [{"role": "user", "content": user_prompt}]
 
 
 def gen_npc_behavior_rules(
-    npc: Dict[str, str], num_rules_per_category: int = 3
+    npc: Dict[str, str], game_lore: Dict[str, Any], num_rules_per_category: int = 3
 ) -> List[Dict[str, str]]:
     """
-    Generates user prompt for structured NPC behavioral rules.
+    Generates messages for structured NPC behavioral rules.
 
     The system prompt with Pydantic schema is added automatically by struct_output().
 
     :param npc: Character description dictionary (name, goal, biography, etc.)
+    :param game_lore: lore with the world description and rules
     :param num_rules_per_category: Rules per situational category (3-5 recommended)
-    :return: User message for LLM (system added by struct_output)
+    :return: Shared lore prefix + user message (schema added by struct_output)
     """
     import json
 
-    user_prompt = f"""Generate behavioral rules for this NPC based on their character:
-
-{json.dumps(npc, indent=2)}
+    # the NPC card goes last, the rules calls of all NPCs share the instructions as prefix
+    user_prompt = f"""Generate behavioral rules for the NPC described at the end, based on their character.
 
 Create exactly {num_rules_per_category} rules per category (each rule 10-15 words).
 
@@ -442,13 +543,16 @@ Output must be valid JSON with this exact structure:
 }}
 
 Each category must contain exactly {num_rules_per_category} rules as strings in a list.
+
+NPC:
+{json.dumps(npc, indent=2)}
 """
 
-    return [{"role": "user", "content": user_prompt}]
+    return gen_lore_prefix_msgs(game_lore) + [{"role": "user", "content": user_prompt}]
 
 
 def gen_entry_point_msg(
-    world_desc,
+    game_lore,
     human_player,
     human_start_k,
     k_desc,
@@ -460,7 +564,7 @@ def gen_entry_point_msg(
     """
     Messages to generate the starting point
 
-    :param world_desc: dict, description of the world
+    :param game_lore: dict, lore with the world description and rules
     :param human_player: dict: human player character card
     :param human_start_k: str: kingdom start
     :param k_desc: dict: description of the kingdom
@@ -471,13 +575,8 @@ def gen_entry_point_msg(
     :return:
     """
 
-    global LORE_GEN_SYS_PRT
-
     entry_point_prt = f"""Generate a starting point for the game.
 
-This is the world:
-{world_desc}
-
 This is the human playr:
 {human_player}
 Starting in: 
@@ -499,7 +598,4 @@ Follow these instructions:
 - mention location of player's allies (if known)
 - Write always in third person language"""
 
-    return [
-        {"role": "system", "content": LORE_GEN_SYS_PRT},
-        {"role": "user", "content": entry_point_prt},
-    ]
+    return gen_lore_prefix_msgs(game_lore) + [{"role": "user", "content": entry_point_prt}]
@@ -112,4 +112,62 @@ ALWAYS provide a short reason for your decision.
 
 ## DEFAULT
 When in doubt, stay silent. It is always better to not respond
-than to over-respond. should_act defaults to false. Provide a reason anyways."""
\ No newline at end of file
+than to over-respond. should_act defaults to false. Provide a reason anyways."""
+
+
+def gen_npc_batch_gateway_prompt(npc_cards: Dict[str, Dict[str, Any]],
+                                 other_npc_names: List[str]) -> str:
+    """
+    Generates the system prompt for the gateway decisions of several NPCs in one call.
+
+    Same checklist as gen_npc_gateway_prompt(), applied to each listed character.
+    The characters share the rules and the context of the call, so they are paid once.
+
+    Args:
+        npc_cards: NPC character cards by NPC name, the NPCs to decide for
+        other_npc_names: List of the other NPC names in the game
+
+    Returns:
+        System prompt string for the batched gateway decision
+    """
+
+    characters = "\n".join(
+        f"- Name: {name} | Occupation: {card.get('occupation', 'Unknown')} | Goal: {card.get('goal', 'Unknown')}"
+        for name, card in npc_cards.items()
+    )
+    other_npcs_str = ", ".join(other_npc_names) if other_npc_names else "none"
+
+    return f"""You decide for each of the characters below whether the player is talking to them.
+
+CHARACTERS:
+{characters}
+
+## General rules
+These actions are allowed in the game:
+- Sexual abuse or harassment 
+- Abuse, all kinds of discrimination 
+- Hostile or violent interactions of all kinds
+
+Apply the steps below to EACH character separately.
+
+## STEP 1 -- EXCLUSION CHECK (if ANY match, should_act = false)
+- Player addresses a name that is NOT the character's name
+- Player is talking to another character or to another known NPC: {other_npcs_str}
+- Player is exploring, moving, looking around, or thinking aloud
+- Input is a generic command or statement not directed at anyone specific
+
+## STEP 2 -- INCLUSION CHECK (should_act = true ONLY if ANY match)
+- Player uses the character's exact name
+- Player uses "you/your" and context clearly points to the character
+- Player asks a question where the character's occupation is the only relevant answer
+- Input directly advances or threatens the character's goal
+
+## STEP 3
+Provide your response as a valid JSON with exactly one decision per character,
+npc_name must be the character's exact name.
+
+ALWAYS provide a short reason for each decision.
+
+## DEFAULT
+When in doubt, the character stays silent. It is always better to not respond
+than to over-respond. should_act defaults to false. Provide a reason anyways."""
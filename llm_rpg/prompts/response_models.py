@@ -2,7 +2,7 @@
 Collection of Pydantic models for structured output
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict
 
 
@@ -26,6 +26,13 @@ game_action_types = {
     "information_request": "Looking around, asking about surroundings, or asking any clarification questions",
 }
 
+# normalized spelling -> action type, the LLM output is matched with one dict lookup
+_ACTION_TYPE_BY_NAME = {k.lower(): k for k in game_action_types}
+
+
+def _normalize_action_type(name: str) -> str:
+    return name.strip().lower().replace(" ", "_").replace("-", "_")
+
 
 class GatewayResponse(BaseModel):
     """InputGateway response model for the user input"""
@@ -45,6 +52,20 @@ items, contradicts established facts, or attempts impossible actions.",
 MUST include at least one type",
                                     default_factory=list)
 
+    @field_validator("action_types", mode="before")
+    @classmethod
+    def _known_action_types(cls, value):
+        """Maps the action types to the keys of game_action_types, whatever the casing or separators"""
+        if not isinstance(value, list):
+            return value
+        action_types = []
+        for name in value:
+            action_type = _ACTION_TYPE_BY_NAME.get(_normalize_action_type(name)) if isinstance(name, str) else None
+            if action_type is None:
+                raise ValueError(f"Unknown action type {name!r}, expected one of {list(game_action_types)}")
+            action_types.append(action_type)
+        return action_types
+
 
 # ------------------------------- Inventory Changes -------------------------------
 class InventoryItemChange(BaseModel):
@@ -107,6 +128,18 @@ class NPCGatewayResponse(BaseModel):
     reason: str = Field(description=f"Explain your decision in max {_npc_gateway_reason_len} words")
 
 
+class NPCGatewayDecision(NPCGatewayResponse):
+    """Gateway decision of one NPC in a batched gateway call"""
+
+    npc_name: str = Field(description="Exact name of the NPC the decision is for")
+
+
+class NPCGatewayBatchResponse(BaseModel):
+    """Gateway decisions of several NPCs made in one call"""
+
+    decisions: List[NPCGatewayDecision] = Field(description="Exactly one decision per listed NPC")
+
+
 class NPCResponseModel(BaseModel):
     """Response model for NPC action"""
 
@@ -241,6 +274,23 @@ class NPCCharacterModel(BaseModel):
     )
 
 
+class NPCCharactersModel(BaseModel):
+    """Several NPC companions generated in one call"""
+
+    npcs: List[NPCCharacterModel] = Field(
+        description="List of NPC companion characters",
+    )
+
+
+class PartyModel(BaseModel):
+    """The human player and the NPC companions generated in one call"""
+
+    player: CharacterModel = Field(description="The human player's character")
+    npcs: List[NPCCharacterModel] = Field(
+        description="List of NPC companion characters of the player",
+    )
+
+
 # ------------------------------- World Rules -------------------------------
 class WorldRulesModel(BaseModel):
     """Structured world rules organized by domain
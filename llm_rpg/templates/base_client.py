@@ -1,13 +1,98 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Union
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Union, TypedDict, Iterable, Iterator
 from pydantic import BaseModel
 import json
 import re
 
 
+@lru_cache(maxsize=256)
+def schema_dict(response_model: type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema of a pydantic model class, built once per class. Shared, do not modify it"""
+    return response_model.model_json_schema()
+
+
+@lru_cache(maxsize=256)
+def schema_json(response_model: type[BaseModel]) -> str:
+    """JSON schema of a pydantic model class as a string. Schemas do not change, so it is built once per class"""
+    return json.dumps(schema_dict(response_model))
+
+
+@lru_cache(maxsize=256)
+def json_schema_format(response_model: type[BaseModel]) -> Dict[str, Any]:
+    """
+    OpenAI-style response_format that constrains the decoding to the model's schema
+    (llama.cpp server turns it into a grammar): no malformed JSON, no formatting tokens
+    beyond the schema. Built once per class. Shared, do not modify it
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": response_model.__name__, "schema": schema_dict(response_model)},
+    }
+
+
+# JSON object wrapped in a markdown code block
+_JSON_CODE_BLOCK = re.compile(r'```(?:json)?\s*({.*?})\s*```', re.DOTALL)
+
+# end of a sentence at the end of the streamed text
+_SENTENCE_END = re.compile(r"[.?!]\s*$")
+
+
+@lru_cache(maxsize=256)
+def _struct_prompt(kind: str, response_model: type[BaseModel]) -> str:
+    """Schema system prompt text, assembled once per (kind, model class)"""
+    if kind == "json_object":
+        return f"""You MUST output a JSON object that strictly follows this schema: {schema_json(response_model)}"""
+    return f"""You MUST output a valid JSON without any markdown formatting, code blocks, or additional \
+text that strictly follows this schema: {schema_json(response_model)}"""
+
+
+def cached_prompt_tokens(usage: Any) -> int | None:
+    """
+    Prompt tokens served from the provider's prefix cache, from an OpenAI-style usage
+    (SDK object or dict): usage.prompt_tokens_details.cached_tokens
+
+    :return: int or None if the provider did not report it
+    """
+    def _get(obj: Any, name: str) -> Any:
+        return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+    details = _get(usage, "prompt_tokens_details") if usage is not None else None
+    return _get(details, "cached_tokens") if details is not None else None
+
+
+def _model_class(response_model: Any) -> type[BaseModel]:
+    return response_model if isinstance(response_model, type) else type(response_model)
+
+
+# ----- Response records -----
+# The responses stay plain dicts: they are spread, updated and written to the JSON
+# cache/checkpoint logs; these types only fix the keys of the contract
+class LLMStats(TypedDict, total=False):
+    prompt_tokens: int
+    prompt_eval_duration: float  # ms, -1 if not reported
+    eval_tokens: int
+    eval_duration: float  # ms, -1 if not reported
+    total_tokens: int
+    cached_tokens: int  # prompt tokens served from the provider's prefix cache, if reported
+
+
+class LLMResponse(TypedDict, total=False):
+    message: Any  # str for chat(), pydantic.BaseModel for struct_output()
+    stats: LLMStats
+    reasoning_content: str
+    reasoning: str
+    error: Exception  # struct_output() with a None message: why the output was rejected
+
+
 class BaseClient(ABC):
     """Base class for wrapping different LLM API implementations"""
 
+    # calls in flight for abatch(); the clients override it with what the provider handles
+    default_concurrency: int = 8
+
     def __init__(self, model_name=None, *args, **kwargs) -> Any:
         """
         Initializes the base class with model configuration.
@@ -30,10 +115,84 @@ class BaseClient(ABC):
 
     def enforce_struct_output(self, response_model) -> List[Dict[str, str]]:
         """Adds another system prompt to enforce JSON output"""
-        return [{
-            "role": "system",
-            "content": f"""You MUST output a valid JSON without any markdown formatting, code blocks, or additional \
-text that strictly follows this schema: {json.dumps(response_model.model_json_schema())}"""}]
+        return [{"role": "system", "content": _struct_prompt("json", _model_class(response_model))}]
+
+    @staticmethod
+    def json_object_system(response_model) -> List[Dict[str, str]]:
+        """System prompt for the providers that enforce JSON output themselves (json_object response format)"""
+        return [{"role": "system", "content": _struct_prompt("json_object", _model_class(response_model))}]
+
+    @staticmethod
+    def add_struct_system(messages: List[Dict[str, str]],
+                          struct_system: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Inserts the schema system message right after the leading system messages. A shared
+        system prefix stays then identical for calls with different schemas, so the
+        provider's prompt-prefix cache can be reused.
+
+        :param messages: messages of the call
+        :param struct_system: output of enforce_struct_output() or similar
+        :return: new list of messages
+        """
+        idx = 0
+        while idx < len(messages) and messages[idx].get("role") == "system":
+            idx += 1
+        return messages[:idx] + struct_system + messages[idx:]
+
+    @staticmethod
+    def chunk_text(chunk: Any) -> str:
+        """
+        Returns the text of a streamed chunk. The clients stream plain strings, dicts
+        with "content" or the SDK chunk objects (OpenAI-like or Ollama).
+        """
+        if chunk is None:
+            return ""
+        if isinstance(chunk, str):
+            return chunk
+        if isinstance(chunk, dict):
+            return chunk.get("content") or ""
+        choices = getattr(chunk, "choices", None)
+        if choices:
+            return getattr(choices[0].delta, "content", None) or ""
+        message = getattr(chunk, "message", None)
+        if message is not None:
+            return getattr(message, "content", None) or ""
+        return ""
+
+    def stream_sentences(self, messages: List[Dict[Any, Any]], max_buffer: int = 80, **kwargs) -> Iterator[str]:
+        """
+        Streams the response in sentences instead of tokens, for consumers that pay per event.
+        The text is flushed at a sentence end or once it has max_buffer words.
+
+        :param messages: messages of the call
+        :param max_buffer: int -- max words to hold back
+        :return: generator of text pieces
+        """
+        buffer = ""
+        for chunk in self.stream(messages, **kwargs):
+            buffer += self.chunk_text(chunk)
+            if _SENTENCE_END.search(buffer) or buffer.count(" ") + 1 >= max_buffer:
+                yield buffer
+                buffer = ""
+        if buffer:
+            yield buffer
+
+    @staticmethod
+    def split_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Splits a stream of raw bytes (e.g. iter_content(chunk_size=None)) into lines.
+        Several SSE events may come in one network read, they are split without decoding.
+        """
+        buf = bytearray()
+        for chunk in chunks:
+            buf.extend(chunk)
+            start = 0
+            while (end := buf.find(b"\n", start)) >= 0:
+                yield bytes(buf[start:end]).rstrip(b"\r")
+                start = end + 1
+            del buf[:start]
+        if buf:
+            yield bytes(buf)
 
     def extract_json_from_markdown(self, text: str) -> str:
         """
@@ -45,15 +204,17 @@ text that strictly follows this schema: {json.dumps(response_model.model_json_sc
         :param text: The raw response text that may contain markdown code blocks
         :return: Clean JSON string without markdown wrappers
         """
+        # Plain JSON, the usual case with enforced output: no regex pass needed
+        if "```" not in text:
+            return text
         # Match ```json ... ``` or ``` ... ```
-        pattern = r'```(?:json)?\s*({.*?})\s*```'
-        match = re.search(pattern, text, re.DOTALL)
+        match = _JSON_CODE_BLOCK.search(text)
         if match:
             return match.group(1)
         return text  # Return original if no code block found
 
     @abstractmethod
-    def chat(self, messages: List[Dict[Any, Any]], *arg, **kwargs) -> Dict[str, Any]:
+    def chat(self, messages: List[Dict[Any, Any]], *arg, **kwargs) -> LLMResponse:
         """
         Sends messages to an LLM instance for processing.
 
@@ -70,8 +231,64 @@ text that strictly follows this schema: {json.dumps(response_model.model_json_sc
             }
         """
 
+    def chat_batch(self, batch_messages: List[List[Dict[Any, Any]]], max_workers: int = 8, **kwargs) -> List[LLMResponse]:
+        """
+        Runs independent chat() calls concurrently. The calls are network bound, so a
+        batch takes about as long as its slowest call instead of the sum of all.
+
+        :param batch_messages: one list of messages per call
+        :param max_workers: max calls in flight
+        :return: responses in the order of batch_messages
+        """
+        if len(batch_messages) <= 1:
+            return [self.chat(messages, **kwargs) for messages in batch_messages]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batch_messages))) as ex:
+            return list(ex.map(lambda messages: self.chat(messages, **kwargs), batch_messages))
+
+    async def achat(self, messages: List[Dict[Any, Any]], *args, **kwargs) -> LLMResponse:
+        """
+        Async chat(). By default the sync call runs in a worker thread, the clients
+        with an async SDK override it with a native call.
+        """
+        return await asyncio.to_thread(self.chat, messages, *args, **kwargs)
+
+    async def astruct_output(self, messages: List[Dict[Any, Any]], response_model: BaseModel, **kwargs) -> LLMResponse:
+        """Async struct_output(), the sync call runs in a worker thread"""
+        return await asyncio.to_thread(self.struct_output, messages, response_model, **kwargs)
+
+    async def abatch(self,
+                     batch_messages: List[List[Dict[Any, Any]]],
+                     max_concurrency: int | None = None,
+                     return_exceptions: bool = False,
+                     **kwargs) -> List[LLMResponse | BaseException]:
+        """
+        Async counterpart of chat_batch(): all the calls are in flight at once, at most
+        max_concurrency of them. Provider limits are applied by RateLimitedClient.
+
+        :param batch_messages: one list of messages per call
+        :param max_concurrency: max calls in flight, the client's default_concurrency if None
+        :param return_exceptions: failed calls return their exception instead of failing the batch
+        :return: responses in the order of batch_messages
+        """
+        sem = asyncio.Semaphore(max_concurrency or self.default_concurrency)
+
+        async def _one(messages):
+            async with sem:
+                return await self.achat(messages, **kwargs)
+
+        return list(await asyncio.gather(*(_one(messages) for messages in batch_messages),
+                                         return_exceptions=return_exceptions))
+
+    def batch(self,
+              batch_messages: List[List[Dict[Any, Any]]],
+              max_concurrency: int | None = None,
+              return_exceptions: bool = False,
+              **kwargs) -> List[LLMResponse | BaseException]:
+        """Sync entry point to abatch(), must not be called from a running event loop"""
+        return asyncio.run(self.abatch(batch_messages, max_concurrency, return_exceptions, **kwargs))
+
     @abstractmethod
-    def struct_output(self, messages: List[Dict[Any, Any]], response_model:BaseModel, **kwargs) -> Any:
+    def struct_output(self, messages: List[Dict[Any, Any]], response_model:BaseModel, **kwargs) -> LLMResponse:
         """
         Sends messages to an LLM instance for processing and return Pydantic structured output
         :param messages: A list of message dictionaries, each containing a 'content' key.
@@ -1,25 +1,58 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
-from llm_rpg.clients.llm_factory import LLMFactory
 
 logger = logging.getLogger(__name__)
 
+LLM_TYPES = ("lore_llm", "npc_ai_llm", "game_ai_llm", "input_validator")
 
-def setup_llms(config: dict) -> Dict[str, Any]:
-    """Setup LLM clients based on configuration dict"""
-    llm_clients = {}
-    llm_types = ["lore_llm", "npc_ai_llm", "game_ai_llm", "input_validator"]
+# LLM clients created by setup_llms(), keyed by the config path
+_LLM_CLIENTS: Dict[str, Dict[str, Any]] = {}
+
+
+def setup_llms(config: dict, config_path: str | None = None) -> Dict[str, Any]:
+    """
+    Setup LLM clients based on configuration dict
+
+    :param config: dict -- configuration
+    :param config_path: str -- path the config was loaded from. If given, the clients
+        are created once per path and reused by the next calls
+    :return: Dict[str, Any] -- LLM clients by type
+    """
+    if config_path is not None and config_path in _LLM_CLIENTS:
+        return _LLM_CLIENTS[config_path]
+
+    # the factory pulls in the provider SDKs, import it only when clients are needed
+    from llm_rpg.clients.llm_factory import LLMFactory
 
     llm_providers = config.get("llm_providers", {})
 
-    for llm_type in llm_types:
+    def _create(llm_type: str) -> Any:
         llm_config = llm_providers.get(llm_type)
-        if llm_config is not None:
-            llm_clients[llm_type] = LLMFactory.create_llm_client(llm_config)
-            logging.info(f"Created {llm_type} client: {llm_config.get('provider')}")
-        else:
-            llm_clients[llm_type] = None
+        if llm_config is None:
+            return None
+        client = LLMFactory.create_llm_client(llm_config)
+        logger.info("Created %s client: %s", llm_type, llm_config.get("provider"))
+        if llm_config.get("cache"):
+            from llm_rpg.clients.caching_client import CachingClient
+
+            # the game and NPC clients sample at temperature > 0, replaying their
+            # responses would repeat the story: only deterministic calls are cached
+            client = CachingClient(
+                client,
+                pool_size=0,
+                max_entries=llm_config.get("cache_max_entries", 1024),
+                ttl=llm_config.get("cache_ttl"),
+            )
+        return client
+
+    # client construction may do network I/O (auth, model lookup), so the clients
+    # are created in parallel: setup takes as long as the slowest one
+    with ThreadPoolExecutor(max_workers=len(LLM_TYPES)) as ex:
+        llm_clients = dict(zip(LLM_TYPES, ex.map(_create, LLM_TYPES)))
 
+    if config_path is not None:
+        _LLM_CLIENTS[config_path] = llm_clients
     return llm_clients
 
 
@@ -1,17 +1,27 @@
 import json
+import os
+from functools import lru_cache
 from pathlib import Path
 from llm_rpg.utils.config_models import AppConfig
 
+@lru_cache(maxsize=8)
+def _load_config_model(config_path: str, mtime_ns: int) -> AppConfig:
+    """Parses and validates the config file, once per path and file version"""
+    with open(config_path, "r") as f:
+        data = json.load(f)
+    # Validate using Pydantic (raises ValidationError on failure)
+    return AppConfig.model_validate(data)
+
+
 def load_config(config_path: str) -> dict:
     """
     Load and validate config from JSON file.
     Returns a plain dict (model_dump output) for compatibility.
+    The file is parsed again only if it was modified since the last call.
     """
-    with open(config_path, "r") as f:
-        data = json.load(f)
-    # Validate using Pydantic (raises ValidationError on failure)
-    config_model = AppConfig.model_validate(data)
-    # Return plain dict for compatibility with existing code
+    config_model = _load_config_model(config_path, os.stat(config_path).st_mtime_ns)
+    # Return plain dict for compatibility with existing code, a fresh one on
+    # every call, so the callers may modify it
     return config_model.model_dump()
 
 
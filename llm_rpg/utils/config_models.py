@@ -13,6 +13,10 @@ class LLMConfig(BaseModel):
     api_key_env: str
     base_url: Optional[str] = None
     props: LLMProps = Field(default_factory=LLMProps)
+    # in-memory exact-match response cache for temperature == 0 calls, see CachingClient
+    cache: bool = False
+    cache_max_entries: int = Field(default=1024, ge=1)
+    cache_ttl: Optional[float] = Field(default=None, gt=0)
 
 
 class PathsConfig(BaseModel):
@@ -28,6 +32,39 @@ class LoreGenerationConfig(BaseModel):
     max_generation_retries: int = 3
     temperature_cooldown_step: float = 0.1
     temperature_min: float = 0.5
+    max_concurrent_requests: int = Field(default=4,
+                                         ge=1,
+                                         description="Max LLM calls in flight for independent lore stages")
+    npc_batch_size: int = Field(default=8,
+                                ge=1,
+                                description="Max NPCs requested in one LLM call")
+    fused_party: bool = Field(default=False,
+                              description="Generate the human player and the NPCs in one LLM call")
+    requests_per_second: float | None = Field(default=None,
+                                              gt=0,
+                                              description="Max LLM requests per second, None for no limit")
+    tokens_per_minute: int | None = Field(default=None,
+                                          gt=0,
+                                          description="Max LLM tokens per minute, None for no limit")
+    max_prompt_tokens: int | None = Field(default=None,
+                                          gt=0,
+                                          description="Prompts over this many tokens fail before they are sent, None for no limit")
+    llm_cache: bool = Field(default=True,
+                            description="Keep lore generation responses in <save_location>/llm_cache")
+    llm_cache_dir: Optional[str] = Field(default=None,
+                                         description="Folder shared by all games for the cached responses, "
+                                                     "e.g. ~/.cache/neuroquest/llm. None for <save_location>/llm_cache. "
+                                                     "By default only temperature == 0 responses are shared, so new "
+                                                     "games with the same settings do not get the same world")
+    llm_cache_pool_size: Optional[int] = Field(default=None,
+                                               ge=0,
+                                               description="Responses cached per prompt for temperature > 0 calls, "
+                                                           "a random one is reused once the pool is full. 0 caches "
+                                                           "only temperature == 0 calls. None for 1 with the per-game "
+                                                           "cache and 0 with llm_cache_dir: a larger pool saves more "
+                                                           "calls, a smaller one repeats less lore between games")
+    llm_cache_refresh: bool = Field(default=False,
+                                    description="Do not use the cached responses, replace them with new ones")
 
 
 class GameConfig(BaseModel):
@@ -37,6 +74,21 @@ class GameConfig(BaseModel):
     max_generation_retries: int = 3
     temperature_cooldown_step: float = 0.1
     temperature_min: float = 0.5
+    max_concurrent_npcs: int = Field(default=4,
+                                     ge=1,
+                                     description="Max NPC LLM calls in flight during a turn")
+    speculative_npc: bool = Field(default=False,
+                                  description="Start the NPCs before the user input is validated")
+    npc_order_seed: Optional[int] = Field(default=None,
+                                          description="Seed of the NPC turn order, None for a random one")
+    npc_gateway: bool = Field(default=False,
+                              description="NPCs act only if the gateway decides the input is directed at them")
+    npc_batch_size: int = Field(default=2,
+                                ge=1,
+                                description="Max NPCs decided in one gateway LLM call")
+    validator_cache_size: int = Field(default=256,
+                                      ge=0,
+                                      description="Input validation results kept for repeated inputs, 0 to disable")
 
 
 class TemperatureConfig(BaseModel):
@@ -1,4 +1,5 @@
 from typing import Dict, List, Set, Union, Any
+import os
 
 
 def input_not_ok(x, dtype, def_val) -> bool:
@@ -12,6 +13,16 @@ def input_not_ok(x, dtype, def_val) -> bool:
     return not x or (x != def_val and type(x) != dtype)
 
 
+def ensure_dirs(*paths: str) -> None:
+    """
+    Creates the folders that do not exist yet. The existing ones (the usual case on
+    repeated runs) cost a single stat call.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+
+
 def dict_2_str(d: Dict[str, str]) -> str:
     """
     Prints a simple dict to a string
@@ -0,0 +1,45 @@
+"""
+Shared HTTP/2 clients for the provider SDKs. With HTTP/2 the concurrent calls of a client
+(abatch, parallel lore stages) are multiplexed over one TCP+TLS connection instead of
+opening a connection per call. h2 is an optional extra of httpx: without it the helpers
+return None and the SDKs keep their default HTTP/1.1 clients.
+"""
+
+from typing import Any
+
+try:
+    import httpx
+    import h2  # noqa: F401
+    F_IS_HTTP2 = True
+except ImportError:
+    F_IS_HTTP2 = False
+
+
+def _client_kwargs(timeout: float, connect_timeout: float) -> dict[str, Any]:
+    return {
+        "http2": True,
+        "limits": httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        "timeout": httpx.Timeout(timeout, connect=connect_timeout),
+    }
+
+
+def http2_client(timeout: float = 600.0, connect_timeout: float = 5.0) -> Any:
+    """
+    :param timeout: float -- read/write/pool timeout in seconds, long completions must fit in
+    :param connect_timeout: float -- connect timeout in seconds
+    :return: httpx.Client or None if HTTP/2 is not available
+    """
+    if not F_IS_HTTP2:
+        return None
+    return httpx.Client(**_client_kwargs(timeout, connect_timeout))
+
+
+def http2_async_client(timeout: float = 600.0, connect_timeout: float = 5.0) -> Any:
+    """
+    :param timeout: float -- read/write/pool timeout in seconds, long completions must fit in
+    :param connect_timeout: float -- connect timeout in seconds
+    :return: httpx.AsyncClient or None if HTTP/2 is not available
+    """
+    if not F_IS_HTTP2:
+        return None
+    return httpx.AsyncClient(**_client_kwargs(timeout, connect_timeout))
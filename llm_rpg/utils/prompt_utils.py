@@ -1,8 +1,10 @@
 import json
-import time
 import logging
 from copy import deepcopy as dCP
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Generator
+
+from llm_rpg.templates.base_client import schema_dict
+from llm_rpg.utils.tokens import PromptTooLongError
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,30 @@ def cooldown_llm_temp(temp: float, dt: float, min_temp: float = 0.5) -> float:
     return max(min_temp, temp - dt)
 
 
+def _validation_feedback(error: Exception | None, max_errors: int = 5) -> str:
+    """
+    Field errors of a pydantic ValidationError as a prompt section, "" for other errors.
+    The clients wrap the ValidationError (raise ... from e), the cause chain is searched.
+    """
+    while error is not None and not callable(getattr(error, "errors", None)):
+        error = error.__cause__
+    if error is None:
+        return ""
+    errors = error.errors
+    try:
+        details = errors()
+    except Exception:
+        return ""
+    lines = [
+        f"- {'.'.join(str(p) for p in e.get('loc', ())) or 'root'}: {e.get('msg')}"
+        for e in details[:max_errors]
+        if isinstance(e, dict)
+    ]
+    if not lines:
+        return ""
+    return "\n\nYour previous response had these errors, fix them:\n" + "\n".join(lines)
+
+
 def enhance_system_message_for_retry(
     messages: List[Dict[str, str]],
     response_model,
@@ -54,8 +80,8 @@ def enhance_system_message_for_retry(
         response_model: Pydantic model for schema extraction and example generation
         attempt: Current retry attempt number (0-based, so first retry is attempt=1)
         max_retries: Total maximum retry attempts configured
-        last_error: Previous error that caused the retry (can be used for
-                   error-specific guidance in future enhancements)
+        last_error: Previous error that caused the retry. The field errors of a
+                   failed validation are listed, so the LLM can fix exactly these
 
     Returns:
         Enhanced message list with additional system guidance appended to
@@ -76,7 +102,7 @@ def enhance_system_message_for_retry(
 
     if enhancement_level == 1:
         # First retry (early): Add schema reminder
-        schema_str = json.dumps(response_model.model_json_schema(), indent=2)
+        schema_str = json.dumps(schema_dict(response_model), indent=2)
         enhancement = f"""
 
 IMPORTANT: Your previous response was not valid JSON. Please output ONLY valid JSON matching this exact schema:
@@ -87,7 +113,7 @@ Do NOT include markdown formatting, code blocks, or any explanatory text."""
 
     elif enhancement_level == 2:
         # Second retry (mid): Add explicit example
-        schema = response_model.model_json_schema()
+        schema = schema_dict(response_model)
         properties = schema.get("properties", {})
 
         # Build a minimal example structure
@@ -119,7 +145,7 @@ Rules:
 
     else:
         # Third+ retry (late): Maximum strictness with field-by-field breakdown
-        schema = response_model.model_json_schema()
+        schema = schema_dict(response_model)
         required_fields = schema.get("required", [])
         properties = schema.get("properties", {})
 
@@ -146,6 +172,8 @@ Output Format:
 NO MARKDOWN. NO CODE BLOCKS. NO TEXT BEFORE OR AFTER THE JSON.
 JUST THE RAW JSON OBJECT."""
 
+    enhancement += _validation_feedback(last_error)
+
     # Add enhancement to existing system message or prepend new one
     if system_msg:
         system_msg["content"] = system_msg["content"] + enhancement
@@ -178,7 +206,6 @@ def generate_with_retry(
     On each retry attempt:
     - System message is enhanced with increasingly strict JSON guidance
     - Temperature is reduced by cooldown_step (capped at temperature_min)
-    - A short delay (0.5s) occurs between attempts
 
     Args:
         client: LLM client instance with struct_output() method
@@ -234,6 +261,68 @@ def generate_with_retry(
         This function makes a deep copy of messages to avoid modifying the caller's
         original list. System message enhancements are applied to the copy only.
     """
+    attempts = _struct_attempts(
+        messages, response_model, max_retries, fallback_value, component_name,
+        temperature_cooldown_step, temperature_min, client_kw,
+    )
+    try:
+        call_messages, call_kw = next(attempts)
+        while True:
+            try:
+                response = client.struct_output(call_messages, response_model, **call_kw)
+            except Exception as e:
+                response = e
+            call_messages, call_kw = attempts.send(response)
+    except StopIteration as done:
+        return done.value
+
+
+async def agenerate_with_retry(
+    client,
+    messages: List[Dict[str, str]],
+    response_model,
+    max_retries: int = 3,
+    fallback_value=None,
+    component_name: str = "",
+    temperature_cooldown_step: float = 0.1,
+    temperature_min: float = 0.5,
+    **client_kw,
+) -> Dict[str, Any]:
+    """
+    Same as generate_with_retry(), the calls go through client.astruct_output(). The
+    clients with an async SDK do not block a thread while the request is in flight.
+    """
+    attempts = _struct_attempts(
+        messages, response_model, max_retries, fallback_value, component_name,
+        temperature_cooldown_step, temperature_min, client_kw,
+    )
+    try:
+        call_messages, call_kw = next(attempts)
+        while True:
+            try:
+                response = await client.astruct_output(call_messages, response_model, **call_kw)
+            except Exception as e:
+                response = e
+            call_messages, call_kw = attempts.send(response)
+    except StopIteration as done:
+        return done.value
+
+
+def _struct_attempts(
+    messages: List[Dict[str, str]],
+    response_model,
+    max_retries: int,
+    fallback_value,
+    component_name: str,
+    temperature_cooldown_step: float,
+    temperature_min: float,
+    client_kw: Dict[str, Any],
+) -> Generator[tuple, Any, Dict[str, Any]]:
+    """
+    The retry logic of generate_with_retry() without the LLM call, shared by the sync and
+    async versions: yields (messages, client kwargs) of each attempt and is sent back the
+    struct_output() response or the exception it raised. Returns the final result.
+    """
     last_error = None
 
     # Extract initial temperature from kwargs or use default
@@ -266,9 +355,9 @@ def generate_with_retry(
                     current_temp = new_temp
                     client_kw["temperature"] = current_temp
 
-            response = client.struct_output(
-                working_messages, response_model, **client_kw
-            )
+            response = yield working_messages, client_kw
+            if isinstance(response, Exception):
+                raise response
 
             if response["message"] is not None:
                 logger.info(
@@ -279,20 +368,21 @@ def generate_with_retry(
                 response["message"] = response["message"].model_dump()
                 return response
 
-            last_error = ValueError("struct_output returned None message")
+            # the clients that return a None message may report the error they swallowed
+            last_error = response.get("error") or ValueError("struct_output returned None message")
             logger.warning(
                 f"{component_name}: Attempt {attempt + 1} failed - message is None"
             )
 
+        except PromptTooLongError:
+            # the retries only make the prompt longer
+            raise
         except Exception as e:
             last_error = e
             logger.warning(
                 f"{component_name}: Attempt {attempt + 1} failed - {type(e).__name__}: {e}"
             )
 
-        if attempt < max_retries - 1:
-            time.sleep(0.5)
-
     logger.error(
         f"{component_name}: All {max_retries} attempts failed. Last error: {last_error}"
     )
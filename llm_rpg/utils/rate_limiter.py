@@ -0,0 +1,138 @@
+"""
+Token-bucket rate limiter for LLM calls. Calls proceed immediately while the provider
+has headroom and only wait when the configured requests/tokens budget is used up.
+On a rate limit error (HTTP 429) the call is retried with exponential backoff and jitter.
+"""
+
+from typing import Callable, Awaitable, Any
+import asyncio
+import random
+import threading
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """
+    Checks if the exception is a provider rate limit error. The SDKs raise different
+    exception types, but all of them expose the HTTP status code either directly or
+    via the response object.
+    """
+    if getattr(e, "status_code", None) == 429:
+        return True
+    response = getattr(e, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+class RateLimiter:
+    def __init__(self,
+                 rps: float | None = None,
+                 tpm: int | None = None,
+                 max_retries: int = 5,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 30.0):
+        """
+        :param rps: float -- max requests per second, None to disable
+        :param tpm: int -- max tokens per minute, None to disable
+        :param max_retries: int -- retries on rate limit errors
+        :param backoff_base: float -- first backoff delay in seconds
+        :param backoff_max: float -- upper bound of a backoff delay in seconds
+        """
+        self.rps = rps
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # the buckets start full, so the first calls never wait
+        self._req_capacity = max(1.0, rps) if rps else 0.0
+        self._req_tokens = self._req_capacity
+        self._tok_tokens = float(tpm) if tpm else 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        self._last = now
+        if self.rps:
+            self._req_tokens = min(self._req_capacity, self._req_tokens + elapsed * self.rps)
+        if self.tpm:
+            self._tok_tokens = min(float(self.tpm), self._tok_tokens + elapsed * self.tpm / 60)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Takes the budget of one request if it is there, returns the time to wait otherwise"""
+        # a single request larger than the whole budget must still pass eventually
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = 0.0
+            if self.rps and self._req_tokens < 1:
+                wait = (1 - self._req_tokens) / self.rps
+            if self.tpm and self._tok_tokens < tokens:
+                wait = max(wait, (tokens - self._tok_tokens) * 60 / self.tpm)
+            if wait == 0:
+                if self.rps:
+                    self._req_tokens -= 1
+                if self.tpm:
+                    self._tok_tokens -= tokens
+            return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """
+        Blocks until there is budget for one request of ~tokens tokens.
+        :param tokens: int -- estimated tokens of the request
+        """
+        if not self.rps and not self.tpm:
+            return
+        while (wait := self._try_acquire(tokens)) > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Same as acquire(), waits without blocking the event loop"""
+        if not self.rps and not self.tpm:
+            return
+        while (wait := self._try_acquire(tokens)) > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, estimated: int, actual: int | None) -> None:
+        """Corrects the token budget once the actual usage of a request is known"""
+        if not self.tpm or actual is None:
+            return
+        with self._lock:
+            self._tok_tokens -= actual - estimated
+
+    def call(self, fn: Callable, *args, tokens: int = 0, **kwargs) -> Any:
+        """
+        Calls fn(*args, **kwargs) within the budget, retries it on rate limit errors.
+        :param fn: Callable -- LLM call
+        :param tokens: int -- estimated tokens of the request
+        :return: whatever fn returns
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+
+    async def acall(self, fn: Callable[..., Awaitable], *args, tokens: int = 0, **kwargs) -> Any:
+        """Same as call() for an async LLM call"""
+        for attempt in range(self.max_retries + 1):
+            await self.aacquire(tokens)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff delay with full jitter"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        logger.warning("Rate limited, retrying in %.1fs (attempt %s/%s)", delay, attempt + 1, self.max_retries)
+        return delay
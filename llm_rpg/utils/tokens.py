@@ -0,0 +1,43 @@
+"""
+Prompt token counting. With tiktoken installed the messages are encoded with the model's
+encoding (cl100k_base for the models tiktoken does not know), otherwise the count is an
+estimate of ~4 characters per token.
+"""
+
+from functools import lru_cache
+from typing import List, Dict, Any
+
+try:
+    import tiktoken
+    F_IS_TIKTOKEN = True
+except ImportError:
+    F_IS_TIKTOKEN = False
+
+# chat formatting tokens added per message by the OpenAI-like templates
+_TOKENS_PER_MESSAGE = 4
+
+
+class PromptTooLongError(ValueError):
+    """The prompt does not fit the token budget, retrying the same prompt cannot help"""
+
+
+@lru_cache(maxsize=16)
+def _encoding(model_name: str | None) -> Any:
+    """Encodings are expensive to load, one per model is kept"""
+    try:
+        return tiktoken.encoding_for_model(model_name or "")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(messages: List[Dict[Any, Any]], model_name: str | None = None) -> int:
+    """
+    :param messages: messages of the call
+    :param model_name: str -- model the encoding is picked for
+    :return: int -- prompt tokens of the messages
+    """
+    contents = [str(m.get("content", "")) for m in messages]
+    if not F_IS_TIKTOKEN:
+        return sum(len(c) for c in contents) // 4
+    enc = _encoding(model_name)
+    return sum(len(enc.encode(c, disallowed_special=())) + _TOKENS_PER_MESSAGE for c in contents)